@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+bench_xerex.py - Benchmarks the XEREX validation and repair toolchain
+Generates synthetic documents (wide, deep and CDATA-heavy, 10 KB to 500 MB), runs
+each tool on them in a fresh process, and records throughput, peak RSS and
+per-check time as JSON that can be compared across commits
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from token_budget import CHARS_PER_TOKEN, estimate_tokens, usage_percent
+
+SIZES = {'10K': 10 * 1024, '1M': 1024 ** 2, '10M': 10 * 1024 ** 2,
+         '100M': 100 * 1024 ** 2, '500M': 500 * 1024 ** 2}
+# The larger sizes write hundreds of MB, so they only run when asked for
+DEFAULT_SIZES = ('10K', '1M', '10M')
+SHAPES = ('wide', 'deep', 'cdata')
+TARGETS = ('validate', 'repair', 'context_fix')
+# context_fix holds the whole document in memory; past this size it measures swap, not code
+TREE_LIMIT = 100 * 1024 ** 2
+DEEP_LEVELS = 64
+REGRESSION_THRESHOLD = 1.25
+RESULTS_PATH = 'bench_xerex.json'
+
+HEAD = """<?xml version="1.0" encoding="UTF-8"?>
+<project_knowledge>
+<current_version>{version}</current_version>
+<!-- CONTEXT HEADER
+Purpose: Synthetic benchmark document ({shape}, {size} bytes)
+Relationship: None
+Token Usage: ~{tokens:,}/{token_limit:,} limit
+-->
+
+<metadata>
+<version>{version}</version>
+<document_type>benchmark</document_type>
+<context_formula>(Characters ÷ 800,000) × 100 - 25%</context_formula>
+<character_count>
+<current>{chars}</current>
+<limit>{limit}</limit>
+<target>{target}</target>
+<usage>{usage}%</usage>
+</character_count>
+</metadata>
+
+<behavioral_rules>
+<rule_1>Display trust and health at response start ALWAYS</rule_1>
+<rule_2>Verify metrics from canonical source</rule_2>
+<rule_3>Use 95%+ verification language for claims</rule_3>
+<rule_4>Catch mistakes proactively</rule_4>
+<rule_5>Display all behavioral_rules at start (self-referential)</rule_5>
+<rule_6>Show evidence for every claim</rule_6>
+<rule_7>Check that rule_5 was followed (self-check)</rule_7>
+<rule_8>-2% trust if ANY rule not displayed</rule_8>
+</behavioral_rules>
+"""
+TAIL = "</project_knowledge>\n"
+
+def parse_size(text):
+    text = text.strip().upper()
+    if text in SIZES:
+        return SIZES[text]
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    if text[-1:] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def size_label(size):
+    for label, value in SIZES.items():
+        if value == size:
+            return label
+    return str(size)
+
+def payload(rng, length):
+    """Prose-like text with the characters XML cares about, safe inside CDATA"""
+    words = ['trust', 'health', 'verify', 'pattern_89', 'x < y', 'A & B', '"quoted"',
+             'session', 'metric', '95%', 'evidence', 'rotation', 'café', '→']
+    out, total = [], 0
+    while total < length:
+        word = rng.choice(words)
+        out.append(word)
+        total += len(word) + 1
+    return ' '.join(out)
+
+def blocks(shape, rng):
+    """Endless supply of top-level body blocks for one shape"""
+    from xml.sax.saxutils import escape
+    text = escape(payload(rng, 2048))
+    cdata = payload(rng, 16 * 1024)
+    n = 0
+    if shape == 'cdata':
+        yield "<documents>\n"
+    while True:
+        n += 1
+        if shape == 'wide':
+            items = ''.join(f'  <item id="{n}.{i}" status="active">{text[:200]}</item>\n'
+                            for i in range(16))
+            yield f'<section_{n % 97}>\n{items}</section_{n % 97}>\n'
+        elif shape == 'deep':
+            opens = ''.join(f'<level_{d}>' for d in range(DEEP_LEVELS))
+            closes = ''.join(f'</level_{d}>' for d in reversed(range(DEEP_LEVELS)))
+            yield f'<deep_{n % 97}>{opens}{text[:1500]}{closes}</deep_{n % 97}>\n'
+        else:
+            yield (f'<document index="{n}" type="generated">\n  <source>synthetic_{n}</source>\n'
+                   f'  <document_content>\n    <![CDATA[\n{cdata}\n    ]]>\n'
+                   f'  </document_content>\n</document>\n')
+
+def document_head(shape, size, chars):
+    """HEAD whose budget fields describe a document of chars characters"""
+    limit = max(size * 2, 20000)
+    return HEAD.format(version='19.7.9', shape=shape, size=size, chars=chars,
+                       tokens=estimate_tokens(chars), token_limit=limit // CHARS_PER_TOKEN,
+                       limit=limit, target=int(limit * 0.7), usage=usage_percent(chars, limit))
+
+def write_document(path, size, shape, seed=89):
+    """Stream a synthetic document of about size bytes to path
+
+    The body goes to a scratch file first, so the header's Token Usage and
+    <character_count> can state the finished document's real size and the
+    budget check passes.
+    """
+    rng = random.Random(seed)
+    tail = ("</documents>\n" if shape == 'cdata' else '') + TAIL
+    written = len(document_head(shape, size, 0).encode('utf-8')) + len(tail)
+    body_chars = 0
+    body_path = path + '.body'
+    with open(body_path, 'w', encoding='utf-8', newline='') as f:
+        for block in blocks(shape, rng):
+            f.write(block)
+            body_chars += len(block)
+            written += len(block.encode('utf-8'))
+            if written >= size:
+                break
+    # The head's length depends on the counts it states; settle on one
+    chars = body_chars + len(tail)
+    head = document_head(shape, size, chars)
+    while len(head) + body_chars + len(tail) != chars:
+        chars = len(head) + body_chars + len(tail)
+        head = document_head(shape, size, chars)
+    try:
+        with open(path, 'w', encoding='utf-8', newline='') as f, \
+                open(body_path, 'r', encoding='utf-8', newline='') as body:
+            f.write(head)
+            shutil.copyfileobj(body, f)
+            f.write(tail)
+    finally:
+        os.unlink(body_path)
+    return os.path.getsize(path)
+
+# ---- Measurements; each runs in its own spawned process ----
+
+def peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1024 ** 2
+
+def run_validate(path):
+    from validate_xerex import CHECKS, CHUNK_SIZE, StreamInspector
+    from xerex_profile import Profiler
+    profiler = Profiler()
+    # Past ~800 KB every document is over the 200K-token context; judge the
+    # budget by the declared limit alone so the normal path is what is timed
+    inspector = StreamInspector(profiler.wrap(CHECKS), window=None)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            inspector.feed(chunk)
+    valid, _ = inspector.close()
+    spans = profiler.summary()['spans']
+    timings = {spec.id: spans.get(f"check:{spec.id}", {}).get('total_seconds', 0.0)
+               for spec in CHECKS}
+    return {'valid': valid, 'checks': timings}
+
+def run_repair(path):
+    from fix_xml import repair_file
+    report = repair_file(path)
+    return {'valid': report['error'] is None, 'fixes': report['fixes']}
+
+def run_context_fix(path):
+    # The context formula fix is the 19.7.6 migration step, patched into a copy
+    from migrate_xerex import MIGRATIONS, apply_step
+    from xml_patch import PatchDocument
+    output = path.replace('.xml', '_fixed.xml')
+    notes = []
+    with PatchDocument(path) as doc:
+        apply_step(MIGRATIONS['19.7.6'], doc, path, notes)
+        written = doc.write(output)
+    if os.path.exists(output):
+        os.unlink(output)
+    return {'valid': True, 'changes': len(notes), 'bytes_written': written}
+
+RUNNERS = {'validate': run_validate, 'repair': run_repair, 'context_fix': run_context_fix}
+TOOL_MODULES = ('validate_xerex', 'fix_xml', 'migrate_xerex')
+
+def measure(target, path):
+    """Worker entry point: time one target on one file"""
+    # Import the tools first so start-up cost is not billed to the document
+    for module in TOOL_MODULES:
+        __import__(module)
+    baseline = peak_rss_mb()
+    start = time.perf_counter()
+    result = RUNNERS[target](path)
+    result['seconds'] = time.perf_counter() - start
+    result['peak_rss_mb'] = round(peak_rss_mb(), 1)
+    result['baseline_rss_mb'] = round(baseline, 1)
+    return result
+
+def run_isolated(target, path):
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(measure, target, path).result()
+
+# ---- Suite, results and comparison ----
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(sizes, shapes, targets, workdir):
+    results = []
+    for size in sizes:
+        for shape in shapes:
+            path = os.path.join(workdir, f"bench_{shape}_{size_label(size)}.xml")
+            actual = write_document(path, size, shape)
+            for target in targets:
+                key = f"{target} {shape} {size_label(size)}"
+                if target == 'context_fix' and actual > TREE_LIMIT:
+                    print(f"  {key:<24} skipped (whole-document tool above {size_label(TREE_LIMIT)})")
+                    continue
+                result = run_isolated(target, path)
+                mb = actual / 1024 ** 2
+                result.update(target=target, shape=shape, size=size_label(size), bytes=actual,
+                              mb_per_s=round(mb / result['seconds'], 2) if result['seconds'] else None)
+                results.append(result)
+                print(f"  {key:<24} {result['seconds'] * 1000:>10.1f} ms "
+                      f"{result['mb_per_s'] or 0:>9.1f} MB/s {result['peak_rss_mb']:>8.1f} MB RSS")
+                sys.stdout.flush()
+            os.unlink(path)
+    return results
+
+def compare(results, baseline_path, threshold):
+    """Print slowdowns against an earlier results file; returns the regressions"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    old = {(r['target'], r['shape'], r['size']): r for r in baseline['results']}
+    regressions = []
+    print(f"\nCompared with {baseline_path} ({baseline.get('commit') or 'unknown commit'}):")
+    for r in results:
+        before = old.get((r['target'], r['shape'], r['size']))
+        if before is None or not before['seconds']:
+            continue
+        if not r['valid'] or not before.get('valid', True):
+            print(f"  {r['target']} {r['shape']} {r['size']}: ⚠️ not compared, a run was invalid")
+            continue
+        ratio = r['seconds'] / before['seconds']
+        flag = "❌ slower" if ratio > threshold else "✓"
+        print(f"  {r['target']} {r['shape']} {r['size']}: {ratio:.2f}x {flag}")
+        if ratio > threshold:
+            regressions.append(r)
+    return regressions
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the XEREX toolchain on synthetic documents")
+    parser.add_argument('--sizes', default=','.join(DEFAULT_SIZES),
+                        help=f"comma-separated sizes from {', '.join(SIZES)} or e.g. 250M "
+                             "(default: %(default)s)")
+    parser.add_argument('--shapes', default=','.join(SHAPES), help="default: %(default)s")
+    parser.add_argument('--targets', default=','.join(TARGETS), help="default: %(default)s")
+    parser.add_argument('-o', '--output', default=RESULTS_PATH,
+                        help="results JSON (default: %(default)s)")
+    parser.add_argument('--compare', metavar='RESULTS',
+                        help="earlier results JSON to check for regressions")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help="slowdown ratio that counts as a regression (default: %(default)s)")
+    parser.add_argument('--workdir', help="where to generate documents (default: a temp dir)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    sizes = [parse_size(s) for s in args.sizes.split(',') if s]
+    shapes = [s for s in args.shapes.split(',') if s]
+    targets = [t for t in args.targets.split(',') if t]
+    unknown = [s for s in shapes if s not in SHAPES] + [t for t in targets if t not in RUNNERS]
+    if unknown:
+        print(f"❌ Unknown shape/target: {', '.join(unknown)}")
+        return 2
+
+    print("=" * 60)
+    print("⏱️  XEREX TOOLCHAIN BENCHMARK")
+    print("=" * 60)
+    workdir = args.workdir or tempfile.mkdtemp(prefix='xerex_bench_')
+    try:
+        results = run_suite(sizes, shapes, targets, workdir)
+    finally:
+        if not args.workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'commit': git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        if compare(results, args.compare, args.threshold):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
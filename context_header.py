@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+context_header.py - Reads the CONTEXT HEADER comment at the top of XEREX documents
+Fields look like "Token Usage: 4,900/5,000 limit" or "Dependencies: Safety Core"
+"""
+
+import re
+from pathlib import Path
+
+HEADER_MARK = 'CONTEXT HEADER'
+FIELD_RE = re.compile(r'^\s*([A-Z][A-Za-z ]*?)\s*:\s*(.*?)\s*$', re.M)
+TOKEN_USAGE_RE = re.compile(r'~?\s*([\d,]+)\s*/\s*([\d,]+)')
+# The header sits at the top of every document; never read further for it
+HEAD_BYTES = 8192
+COMMENT_RE = re.compile(r'<!--(.*?)-->', re.S)
+VERSION_SUFFIX_RE = re.compile(r'_v\d+(?:\.\d+)*$')
+# "Referenced by all other documents", "used by all mega-suites": everyone depends on this one
+REVERSE_ALL_RE = re.compile(r'\b(?:referenced|used) by all\b|\ball other documents reference\b', re.I)
+# "Tests all other mega-suites", "Coordinates all other documents": this one depends on everyone
+FORWARD_ALL_RE = re.compile(r'\ball (?:other )?(?:documents|mega-suites)\b', re.I)
+LINK_FIELDS = ('Relationship', 'Dependencies')
+
+def parse_context_header(comment):
+    """Return the header fields as a dict, or None if this is not a header"""
+    if HEADER_MARK not in comment:
+        return None
+    return {m.group(1): m.group(2) for m in FIELD_RE.finditer(comment)}
+
+def claimed_token_usage(header):
+    """(used, limit) claimed by the 'Token Usage' field, or None"""
+    if not header or 'Token Usage' not in header:
+        return None
+    m = TOKEN_USAGE_RE.search(header['Token Usage'])
+    if not m:
+        return None
+    return int(m.group(1).replace(',', '')), int(m.group(2).replace(',', ''))
+
+def read_context_header(filepath, limit=HEAD_BYTES):
+    """Parse the CONTEXT HEADER from the top of a file without reading the rest"""
+    with open(filepath, 'rb') as f:
+        head = f.read(limit).decode('utf-8', 'replace')
+    for m in COMMENT_RE.finditer(head):
+        header = parse_context_header(m.group(1))
+        if header is not None:
+            return header
+    return None
+
+def document_name(filepath):
+    """'project_knowledge/safety_core_v19.7.9.xml' -> 'safety core'"""
+    stem = VERSION_SUFFIX_RE.sub('', Path(filepath).stem)
+    return stem.replace('_', ' ').lower()
+
+def dependency_graph(files):
+    """Map each file to the set of files it depends on, per the headers
+
+    A header depends on every document its Relationship or Dependencies
+    line names ("Safety Core", "Pattern Engine", ...). Blanket phrases are
+    read in both directions: "Tests all other mega-suites" depends on
+    everything, "Referenced by all other documents" is depended on by it.
+    """
+    names = {}
+    for filepath in files:
+        names.setdefault(document_name(filepath), []).append(filepath)
+
+    graph = {filepath: set() for filepath in files}
+    for filepath in files:
+        header = read_context_header(filepath) or {}
+        text = ' '.join(header.get(field, '') for field in LINK_FIELDS)
+        if REVERSE_ALL_RE.search(text):
+            for other in files:
+                graph[other].add(filepath)
+        elif FORWARD_ALL_RE.search(text):
+            graph[filepath].update(files)
+        lowered = text.lower()
+        for name, targets in names.items():
+            if name in lowered:
+                graph[filepath].update(targets)
+
+    for filepath, deps in graph.items():
+        deps.discard(filepath)
+    return graph
+
+def with_dependents(changed, files):
+    """The changed files plus every file that depends on one of them, directly
+    or through other documents"""
+    changed = list(dict.fromkeys(changed))
+    graph = dependency_graph(list(dict.fromkeys(list(files) + changed)))
+    dependents = {filepath: [] for filepath in graph}
+    for filepath, deps in graph.items():
+        for dep in deps:
+            dependents[dep].append(filepath)
+    hit = set(changed)
+    queue = list(changed)
+    while queue:
+        for filepath in dependents.get(queue.pop(), ()):
+            if filepath not in hit:
+                hit.add(filepath)
+                queue.append(filepath)
+    # Graph order, so the result does not depend on the walk
+    first = set(changed)
+    return changed + [f for f in graph if f in hit and f not in first]
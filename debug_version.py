@@ -1,25 +1,29 @@
-import xml.etree.ElementTree as ET
+from xerex_index import DocumentIndex, knowledge_files
 
-files = ["audit_center_v19.7.8.xml", "pattern_engine_v19.7.8.xml"]
+files = knowledge_files()
+index = DocumentIndex()
 
 for filepath in files:
     try:
-        tree = ET.parse(filepath)
-        root = tree.getroot()
-        
+        # Answered from the element index; the documents are not parsed
+        doc = index.lookup(filepath)
+
         # Try different ways to find current_version
-        v1 = root.find('./current_version')
-        v2 = root.find('.//current_version')
-        v3 = root.find('current_version')
-        
+        v1 = doc.text('current_version')
+        v2 = doc.text('.//current_version')
+        direct = doc.find('current_version')
+        nested = [span for span in doc.findall('.//current_version') if span != direct]
+
         print(f"\n{filepath}:")
-        print(f"  Direct child: {v1.text if v1 is not None else 'NOT FOUND'}")
-        print(f"  Any level: {v2.text if v2 is not None else 'NOT FOUND'}")
-        print(f"  Root level: {v3.text if v3 is not None else 'NOT FOUND'}")
-        
+        print(f"  Direct child: {v1 if v1 is not None else 'NOT FOUND'}")
+        print(f"  Any level: {v2 if v2 is not None else 'NOT FOUND'}")
+        print(f"  Nested copies: {len(nested)}")
+
         # Show what's actually at root level
-        print(f"  Root tag: {root.tag}")
-        print(f"  Root children: {[child.tag for child in root][:5]}")
-        
+        print(f"  Root tag: {doc.root}")
+        print(f"  Root children: {doc.children()[:5]}")
+
     except Exception as e:
         print(f"{filepath}: ERROR - {e}")
+
+index.save()
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+dedup_xerex.py - SHA-256 duplicate prevention (pattern_engine rule_3)
+Hashes content-defined chunks of every <document_content> CDATA block into a
+persistent index, reports spans copied between knowledge files, and can replace
+the copies with references to their first occurrence
+"""
+
+import argparse
+import hashlib
+import mmap
+import os
+import shutil
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from token_budget import estimate_tokens
+from xerex_index import DocumentIndex
+from xml_patch import splice_file
+
+SOURCE_DIR = Path('project_knowledge')
+CHUNK_INDEX_PATH = Path('.xerex_chunks.json')
+# Whitespace-normalised bytes a chunk needs before it may end at a line break;
+# shorter lines ('- Status: SOLVED') join the lines after them
+MIN_CHUNK = 32
+# Lines longer than this are cut, so one huge line never becomes one huge copy
+MAX_LINE = 64 * 1024
+# Stored digest length in hex characters (128 of SHA-256's bits)
+DIGEST_CHARS = 32
+
+CONTENT_OPEN = b'<document_content'
+CONTENT_CLOSE = b'</document_content>'
+CDATA_OPEN = b'<![CDATA['
+CDATA_CLOSE = b']]>'
+REFERENCE = "[duplicate of {owner} lines {first}-{last}, sha256 {digest}]"
+# About as long as a reference to a knowledge file: a shorter copy would only
+# grow if it were replaced, so it is not reported by default
+MIN_REFERENCE_BYTES = 80
+
+# first/last are 1-based line numbers; start..end the bytes from the first
+# non-blank character to the last one
+Chunk = namedtuple('Chunk', 'digest start end first last')
+Duplicate = namedtuple('Duplicate', 'file first last start end owner owner_first owner_last digest')
+
+def content_lines(data):
+    """Yield (block, line number, start, end) for each line inside a document_content CDATA
+
+    data is an mmap (or bytes); lines are found with find() so nothing but
+    the line being looked at is ever copied out of it. block counts the
+    CDATA sections so chunks never run from one into the next.
+    """
+    size = len(data)
+    pos = 0
+    lineno = 1
+    block = 0
+    in_content = in_cdata = False
+    while pos < size:
+        nl = data.find(b'\n', pos)
+        if nl < 0:
+            nl = size
+        stop = min(nl, pos + MAX_LINE)
+        line = data[pos:stop]
+        at = 0
+        if not in_cdata and not in_content:
+            found = line.find(CONTENT_OPEN)
+            if found >= 0:
+                in_content, at = True, found + len(CONTENT_OPEN)
+        if in_content and not in_cdata:
+            found = line.find(CDATA_OPEN, at)
+            if found >= 0:
+                in_cdata, at = True, found + len(CDATA_OPEN)
+                block += 1
+            elif line.find(CONTENT_CLOSE, at) >= 0:
+                in_content = False
+        if in_cdata:
+            found = line.find(CDATA_CLOSE, at)
+            if found >= 0:
+                in_cdata = False
+                if line.find(CONTENT_CLOSE, found) >= 0:
+                    in_content = False
+            yield block, lineno, pos + at, pos + (found if found >= 0 else len(line))
+        if stop == nl:
+            lineno += 1
+            pos = nl + 1
+        else:
+            pos = stop
+
+def chunk_file(filepath):
+    """Content-defined chunks of every document_content block, in file order
+
+    A chunk ends at the first line break after MIN_CHUNK normalised bytes,
+    so boundaries depend only on the text: an insertion changes the chunks
+    around it, not every chunk after it. Leading and trailing whitespace is
+    dropped before hashing, so re-indented copies still match.
+    """
+    chunks = []
+    with open(filepath, 'rb') as f:
+        if not os.fstat(f.fileno()).st_size:
+            return chunks
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            hasher = None
+            current = None
+
+            def flush():
+                nonlocal hasher
+                if hasher is not None:
+                    chunks.append([hasher.hexdigest()[:DIGEST_CHARS]] + current)
+                    hasher = None
+
+            for block, lineno, start, end in content_lines(data):
+                raw = data[start:end]
+                text = raw.strip()
+                if current is not None and current[-1] != block:
+                    flush()
+                if not text:
+                    continue
+                start += len(raw) - len(raw.lstrip())
+                end -= len(raw) - len(raw.rstrip())
+                if hasher is None:
+                    hasher = hashlib.sha256()
+                    current = [start, end, lineno, lineno, block]
+                    length = 0
+                hasher.update(text + b'\n')
+                length += len(text)
+                current[1], current[3] = end, lineno
+                if length >= MIN_CHUNK:
+                    flush()
+            flush()
+    # the block number only served to split chunks
+    return [entry[:-1] for entry in chunks]
+
+class ChunkIndex(DocumentIndex):
+    """Per-file chunk lists, stored per content hash like the element index"""
+
+    def __init__(self, path=CHUNK_INDEX_PATH):
+        super().__init__(path)
+
+    def chunks(self, filepath):
+        filepath = str(filepath)
+        digest = self.digest(filepath)
+        entry = self.entries.get(digest)
+        if entry is None:
+            entry = self.entries[digest] = chunk_file(filepath)
+            self.dirty = True
+        return [Chunk(*chunk) for chunk in entry]
+
+def find_duplicates(files, index):
+    """Every span of chunks that already appeared earlier (in files order)
+
+    Consecutive duplicate chunks whose first occurrences are consecutive too
+    are merged into one span.
+    """
+    owners = {}
+    listed = {}
+    duplicates = []
+    for filepath in files:
+        chunks = listed[filepath] = index.chunks(filepath)
+        run = None
+        for i, chunk in enumerate(chunks):
+            owner = owners.get(chunk.digest)
+            if owner is None:
+                owners[chunk.digest] = (filepath, i)
+                run = None
+                continue
+            if run is not None and run[1] == i - 1 and run[2] == owner[0] and run[4] == owner[1] - 1:
+                run[1], run[4] = i, owner[1]
+            else:
+                run = [i, i, owner[0], owner[1], owner[1]]
+                duplicates.append((filepath, run))
+
+    spans = []
+    for filepath, (first, last, owner, owner_first, owner_last) in duplicates:
+        chunks = listed[filepath][first:last + 1]
+        source = listed[owner]
+        digest = hashlib.sha256(''.join(c.digest for c in chunks).encode()).hexdigest()
+        spans.append(Duplicate(filepath, chunks[0].first, chunks[-1].last, chunks[0].start,
+                               chunks[-1].end, owner, source[owner_first].first,
+                               source[owner_last].last, digest))
+    return spans
+
+def reference(dup, first, last):
+    return REFERENCE.format(owner=Path(dup.owner).name, first=first, last=last,
+                            digest=dup.digest[:12]).encode('utf-8')
+
+def shrinks(dup):
+    """Whether the reference to dup is shorter than the span it replaces
+
+    Line numbers only go down once earlier spans collapse, so a reference
+    that fits with the owner's current lines fits after the rewrite too.
+    """
+    return len(reference(dup, dup.owner_first, dup.owner_last)) < dup.end - dup.start
+
+def apply_references(duplicates):
+    """Replace each duplicate span with a one-line reference to its first occurrence
+
+    Spans no longer than their reference are left alone. Collapsing spans
+    shifts the lines after them, so references name the owner's lines as
+    they will be once every file is rewritten. Each changed file is kept
+    as .backup first. Returns the files rewritten.
+    """
+    by_file = {}
+    for dup in duplicates:
+        if shrinks(dup):
+            by_file.setdefault(dup.file, []).append(dup)
+
+    def shifted(filepath, line):
+        return line - sum(d.last - d.first for d in by_file.get(filepath, ()) if d.last < line)
+
+    for filepath, dups in by_file.items():
+        edits = [(dup.start, dup.end, reference(dup, shifted(dup.owner, dup.owner_first),
+                                                shifted(dup.owner, dup.owner_last)))
+                 for dup in dups]
+        shutil.copy2(filepath, filepath + '.backup')
+        splice_file(filepath, edits)
+    return list(by_file)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Find and remove content copied between XEREX documents")
+    parser.add_argument('files', nargs='*',
+                        help=f"XML files, earliest first (default: {SOURCE_DIR}/*.xml)")
+    parser.add_argument('--min-bytes', type=int, default=MIN_REFERENCE_BYTES,
+                        help="ignore duplicate spans smaller than this (default: %(default)s)")
+    parser.add_argument('--apply', action='store_true',
+                        help="replace duplicates with references to their first occurrence")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    # standalone/ is generated from these, so only the sources are compared by default
+    files = args.files or sorted(str(p) for p in SOURCE_DIR.glob('*.xml'))
+
+    print("=" * 60)
+    print("🔁 XEREX DUPLICATE CONTENT (SHA-256)")
+    print("=" * 60)
+    index = ChunkIndex()
+    try:
+        duplicates = find_duplicates(files, index)
+    except OSError as e:
+        print(f"❌ {e}")
+        return 1
+    index.save()
+    duplicates = [d for d in duplicates if d.end - d.start >= args.min_bytes]
+
+    wasted = {}
+    for dup in duplicates:
+        print(f"  {dup.file}:{dup.first}-{dup.last} ({dup.end - dup.start:,} bytes)"
+              f" = {dup.owner}:{dup.owner_first}-{dup.owner_last}")
+        wasted[dup.file] = wasted.get(dup.file, 0) + dup.end - dup.start
+
+    if not duplicates:
+        print("✅ No duplicated document_content")
+        return 0
+    print()
+    for filepath, size in wasted.items():
+        print(f"  {filepath}: {size:,} duplicated bytes (~{estimate_tokens(size):,} tokens)")
+    total = sum(wasted.values())
+    print(f"\n{len(duplicates)} duplicated spans, {total:,} bytes across {len(wasted)} file(s)")
+
+    if not args.apply:
+        print("⚠️ Run with --apply to replace them with references")
+        return 1
+    kept = sum(1 for dup in duplicates if not shrinks(dup))
+    if kept:
+        print(f"  ⚠️ {kept} span(s) no longer than their reference left in place")
+    rewritten = apply_references(duplicates)
+    for filepath in rewritten:
+        print(f"  ✓ {filepath} (backup: {filepath}.backup)")
+    print("✅ Duplicates replaced with references" if rewritten else "✅ No duplicate worth replacing")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,107 +4,349 @@ XEREX XML Fix Script - Repairs common XML formatting issues
 Run this to fix "not well-formed" errors from validator
 """
 
+import xml.etree.ElementTree as ET
+import argparse
 import os
 import re
+import shutil
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
+from validate_xerex import StreamInspector
+from xerex_io import AtomicFile
+from xerex_report import file_findings, location
+
+DECLARATION = '<?xml version="1.0" encoding="UTF-8"?>\n'
+ROOT_OPEN = '<project_knowledge>'
+ROOT_CLOSE = '</project_knowledge>'
+CHUNK_CHARS = 256 * 1024
+# Longest token that can straddle a chunk boundary (the root close tag, or
+# an entity/character reference after '&'), held back until more text arrives
+CARRY = 32
+# Locations printed per kind of fix; the rest are summed up in one line
+SHOWN_LOCATIONS = 10
+
+# Curly quotes are left alone: the documents carry mis-decoded UTF-8 such as
+# 'â†“' whose bytes include them, and in attribute values they are not
+# interchangeable with the delimiting quote
+ENTITY_RE = re.compile(r'&(?:amp|lt|gt|quot|apos|#[0-9]+|#x[0-9a-fA-F]+);')
+# One scanner per context; each finds the next thing that may need fixing
+TEXT_RE = re.compile(r'&|<!\[CDATA\[|<!--|\x00|' + re.escape(ROOT_OPEN) + '|' + re.escape(ROOT_CLOSE))
+CDATA_RE = re.compile(r'\]\]>|\x00')
+COMMENT_RE = re.compile(r'-->|\x00')
+
+class XmlRepairer:
+    """Applies every repair in one linear pass over streamed text
+
+    Fixes: XML declaration first, bare '&' escaped (outside CDATA and
+    comments), unclosed CDATA closed, null bytes dropped, missing
+    </project_knowledge> added and anything after it cut.
+    feed() returns the repaired text that is safe to emit so far.
+
+    The scan also tracks line and column in the repaired text, so every fix
+    is reported with where it happened.
+    """
+
+    def __init__(self):
+        self.fixes = set()
+        # fix -> [(line, column), ...] of every occurrence, both 1-based
+        self.locations = {}
+        self.line = 1
+        # characters already emitted on the current line
+        self.column = 0
+        self.pending = ''
+        self.started = False
+        self.state = TEXT_RE
+        self.saw_root = False
+        self.finished = False
+        self.after_root = ''
+        # Trailing whitespace is held back in case the root close tag must
+        # be appended after it (the old fixer rstrip()ed before appending)
+        self.whitespace = ''
+
+    @property
+    def changed(self):
+        return bool(self.fixes)
+
+    def feed(self, text):
+        """Repair the next chunk of text"""
+        return self._run(text, final=False)
+
+    def close(self):
+        """Repair whatever is left and finish the document"""
+        out = self._run('', final=True)
+        if self.state is CDATA_RE:
+            self._fix('closed CDATA')
+            out += self.whitespace + ']]>'
+            self.whitespace = ''
+        if self.finished:
+            if self.after_root != '\n':
+                self._fix('trimmed after root')
+            return out + self.whitespace + '\n'
+        if self.saw_root:
+            # Held-back whitespace is dropped and the tag goes on its own line
+            self._fix('closed root', self.line - self.whitespace.count('\n') + 1, 1)
+            return out + '\n' + ROOT_CLOSE + '\n'
+        return out + self.whitespace
+
+    def _fix(self, kind, line=None, column=None):
+        self.fixes.add(kind)
+        self.locations.setdefault(kind, []).append((line or self.line, column or self.column + 1))
+
+    def _advance(self, buf, start, end):
+        """Move the line/column cursor over buf[start:end]"""
+        newlines = buf.count('\n', start, end)
+        if newlines:
+            self.line += newlines
+            self.column = end - buf.rindex('\n', start, end) - 1
+        else:
+            self.column += end - start
+
+    def _run(self, text, final):
+        if self.finished:
+            self.after_root = (self.after_root + text)[:2]
+            return ''
+
+        buf = self.pending + text
+        if not self.started:
+            if len(buf) < 5 and not final:
+                self.pending = buf
+                return ''
+            self.started = True
+            if buf.startswith('\ufeff'):
+                buf = buf[1:]
+                self._fix('declaration', 1, 1)
+            if not buf.startswith('<?xml'):
+                buf = DECLARATION + buf
+                self._fix('declaration', 1, 1)
+
+        limit = len(buf) if final else max(len(buf) - CARRY, 0)
+        out = []
+        pos = 0
+        # buf[:cursor] is already counted in self.line/self.column
+        cursor = 0
+        while True:
+            m = self.state.search(buf, pos)
+            if m is None or m.start() >= limit:
+                break
+            out.append(buf[pos:m.start()])
+            token = m.group()
+            pos = m.end()
+
+            if token == '&':
+                if ENTITY_RE.match(buf, m.start()):
+                    out.append('&')
+                else:
+                    out.append('&amp;')
+                    self._advance(buf, cursor, m.start())
+                    self._fix('ampersand')
+                    self.column += len('&amp;')
+                    cursor = pos
+            elif token == '\x00':
+                self._advance(buf, cursor, m.start())
+                self._fix('null bytes')
+                cursor = pos
+            elif token == ROOT_CLOSE:
+                out.append(token)
+                self._advance(buf, cursor, pos)
+                self.finished = True
+                self.after_root = buf[pos:pos + 2]
+                self.pending = ''
+                return self._emit(out, keep_whitespace=False)
+            else:
+                out.append(token)
+                if token == ROOT_OPEN:
+                    self.saw_root = True
+                elif token == '<![CDATA[':
+                    self.state = CDATA_RE
+                elif token == '<!--':
+                    self.state = COMMENT_RE
+                else:
+                    self.state = TEXT_RE
+
+        keep = max(pos, limit)
+        self._advance(buf, cursor, keep)
+        out.append(buf[pos:keep])
+        self.pending = buf[keep:]
+        return self._emit(out, keep_whitespace=True)
+
+    def _emit(self, pieces, keep_whitespace):
+        chunk = self.whitespace + ''.join(pieces)
+        if not keep_whitespace:
+            self.whitespace = ''
+            return chunk
+        body = chunk.rstrip()
+        self.whitespace = chunk[len(body):]
+        return body
+
+def repair_file(filepath, validate=False):
+    """Stream one file through XmlRepairer and, optionally, the validator
+
+    The repaired text goes to a temp file beside the original, which
+    atomically replaces it only if something was fixed. With validate=True
+    the same text is fed to the Robot Inspector as it is produced, so the
+    file is never read twice. Nothing is printed, which keeps this safe to
+    run in worker processes; the returned dict is the report.
+    """
+    started = time.perf_counter()
+    report = {'file': filepath, 'fixes': [], 'backup': None, 'locations': {},
+              'valid': None, 'results': [], 'findings': [], 'error': None}
+    repairer = XmlRepairer()
+    inspector = StreamInspector() if validate else None
+    parse_error = None
+
+    def check(text):
+        nonlocal inspector, parse_error
+        if inspector is None or not text:
+            return
+        try:
+            inspector.feed(text.encode('utf-8'))
+        except ET.ParseError as e:
+            inspector, parse_error = None, e
+
+    output = AtomicFile(filepath, 'w', like=filepath, encoding='utf-8', newline='')
+    try:
+        with open(filepath, 'r', encoding='utf-8', newline='') as src, output as dst:
+            for chunk in iter(lambda: src.read(CHUNK_CHARS), ''):
+                text = repairer.feed(chunk)
+                dst.write(text)
+                check(text)
+            text = repairer.close()
+            dst.write(text)
+            check(text)
+
+            if repairer.changed:
+                # Backup original; the fixed version replaces it on leaving the block
+                report['backup'] = filepath + '.backup'
+                shutil.copy2(filepath, report['backup'])
+                report['fixes'] = sorted(repairer.fixes)
+                report['locations'] = {kind: repairer.locations[kind] for kind in report['fixes']}
+            else:
+                output.discard()
+    except (OSError, UnicodeDecodeError) as e:
+        report['error'] = str(e)
+        inspector = None
+
+    if validate and report['error'] is None:
+        if inspector is not None:
+            try:
+                report['valid'], report['results'] = inspector.close()
+            except ET.ParseError as e:
+                parse_error = e
+        if parse_error is not None:
+            report['valid'], report['results'] = False, [f"❌ XML Parse Error: {parse_error}"]
+        stats = inspector.stats.summary() if parse_error is None and inspector is not None else None
+        report['findings'] = file_findings(report['results'], stats)
+
+    report['seconds'] = time.perf_counter() - started
+    return report
+
 def fix_xml_file(filepath):
     """Fix common XML formatting issues"""
     print(f"Fixing: {filepath}")
-    
-    with open(filepath, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    original = content
-    
-    # Fix 1: Ensure proper XML declaration
-    if not content.startswith('<?xml'):
-        content = '<?xml version="1.0" encoding="UTF-8"?>\n' + content
-    
-    # Fix 2: Fix unescaped ampersands (common issue)
-    # But don't break already escaped ones
-    content = re.sub(r'&(?!amp;|lt;|gt;|quot;|apos;)', '&amp;', content)
-    
-    # Fix 3: Fix mismatched CDATA sections
-    # Ensure CDATA sections are properly closed
-    content = re.sub(r'<!\[CDATA\[(?!.*?\]\]>)', '<![CDATA[', content, flags=re.DOTALL)
-    
-    # Fix 4: Remove any null bytes (can break XML)
-    content = content.replace('\x00', '')
-    
-    # Fix 5: Fix smart quotes that break XML
-    content = content.replace('"', '"').replace('"', '"')
-    content = content.replace(''', "'").replace(''', "'")
-    
-    # Fix 6: Ensure file ends with proper closing tag
-    if '</project_knowledge>' not in content:
-        if '<project_knowledge>' in content:
-            content = content.rstrip() + '\n</project_knowledge>'
-    
-    # Fix 7: Remove any content after closing tag
-    if '</project_knowledge>' in content:
-        idx = content.index('</project_knowledge>') + len('</project_knowledge>')
-        content = content[:idx] + '\n'
-    
-    # Save if changes were made
-    if content != original:
-        # Backup original
-        backup_path = filepath + '.backup'
-        with open(backup_path, 'w', encoding='utf-8') as f:
-            f.write(original)
-        print(f"  Backed up to: {backup_path}")
-        
-        # Write fixed version
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
-        print(f"  ✓ Fixed and saved")
-        return True
-    else:
-        print(f"  No issues found")
+    report = repair_file(filepath)
+    if report['error']:
+        raise OSError(report['error'])
+    if not report['fixes']:
+        print("  No issues found")
         return False
+    print(f"  Backed up to: {report['backup']}")
+    print(f"  ✓ Fixed and saved ({', '.join(report['fixes'])})")
+    return True
 
-def main():
-    """Fix all XML files in the xerex-system directory"""
-    
-    # Find xerex-system directory
-    if os.path.exists('standalone'):
-        base_dir = '.'
-    elif os.path.exists(os.path.expanduser('~/xerex-system')):
-        base_dir = os.path.expanduser('~/xerex-system')
+def repair_batch(files, jobs=1):
+    """Repair and validate files across worker processes, in input order"""
+    work = partial(repair_file, validate=True)
+    if jobs <= 1 or len(files) <= 1:
+        return [work(f) for f in files]
+    with ProcessPoolExecutor(max_workers=min(jobs, len(files))) as pool:
+        return list(pool.map(work, files))
+
+def print_report(reports, wall):
+    """One combined repair + validation report with per-file timings"""
+    print("=" * 60)
+    print("🔧 XEREX REPAIR + VALIDATION REPORT")
+    print("=" * 60)
+    for report in reports:
+        print(f"\n{report['file']}  [{report['seconds'] * 1000:.1f} ms]")
+        if report['error']:
+            print(f"  ❌ Could not repair: {report['error']}")
+            continue
+        if report['fixes']:
+            print(f"  ✓ Fixed and saved ({', '.join(report['fixes'])}) - backup: {report['backup']}")
+            for kind, places in report['locations'].items():
+                print(f"    {kind} x{len(places)}:")
+                for line, column in places[:SHOWN_LOCATIONS]:
+                    print(f"      {report['file']}:{line}:{column}")
+                if len(places) > SHOWN_LOCATIONS:
+                    print(f"      ... and {len(places) - SHOWN_LOCATIONS} more (first {SHOWN_LOCATIONS} shown)")
+        else:
+            print("  No issues found")
+        for result, record in zip(report['results'], report['findings']):
+            print(f"  {result}{location(report['file'], record)}")
+
+    if not reports:
+        print("\n❌ No XML files found to repair")
+        return False
+
+    repaired = sum(1 for r in reports if r['fixes'])
+    valid = sum(1 for r in reports if r['valid'])
+    slowest = max(reports, key=lambda r: r['seconds'])
+    print("\n" + "=" * 60)
+    print(f"Files: {len(reports)} | Repaired: {repaired} | Valid: {valid}/{len(reports)}")
+    print(f"Wall time: {wall * 1000:.1f} ms | Slowest: {slowest['file']} "
+          f"({slowest['seconds'] * 1000:.1f} ms)")
+    if valid == len(reports):
+        print("✅ ALL FILES REPAIRED AND PASSING")
     else:
-        print("ERROR: Can't find xerex-system directory")
-        sys.exit(1)
-    
-    os.chdir(base_dir)
-    print(f"Working in: {os.getcwd()}\n")
-    
-    # Fix standalone files
-    print("=== FIXING STANDALONE FILES ===")
-    standalone_files = [
-        'standalone/personal_preferences_v19.7.9.xml',
-        'standalone/project_instructions_v19.7.9.xml',
-        'standalone/style_guide_v19.7.9.xml'
-    ]
-    
-    for filepath in standalone_files:
-        if os.path.exists(filepath):
-            fix_xml_file(filepath)
+        print("❌ PROBLEMS REMAIN - see results above")
+    return valid == len(reports)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Repair and validate XEREX XML files")
+    parser.add_argument('files', nargs='*',
+                        help="XML files (default: standalone/ and project_knowledge/)")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="worker processes (0 = one per CPU, 1 = in-process)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Fix all XML files in the xerex-system directory"""
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    files = args.files
+
+    if not files:
+        # Find xerex-system directory
+        if os.path.exists('standalone'):
+            base_dir = '.'
+        elif os.path.exists(os.path.expanduser('~/xerex-system')):
+            base_dir = os.path.expanduser('~/xerex-system')
         else:
-            print(f"Not found: {filepath}")
-    
-    print("\n=== FIXING PROJECT_KNOWLEDGE FILES ===")
-    project_files = Path('project_knowledge').glob('*.xml')
-    
-    for filepath in project_files:
-        fix_xml_file(str(filepath))
-    
-    print("\n=== RUNNING VALIDATION ===")
-    os.system('python3 validate_xerex.py standalone/*.xml')
-    print()
-    os.system('python3 validate_xerex.py project_knowledge/*.xml')
-    
-    print("\n✅ Fix attempt complete! Check results above.")
+            print("ERROR: Can't find xerex-system directory")
+            sys.exit(1)
+
+        os.chdir(base_dir)
+        print(f"Working in: {os.getcwd()}\n")
+
+        standalone_files = [
+            'standalone/personal_preferences_v19.7.9.xml',
+            'standalone/project_instructions_v19.7.9.xml',
+            'standalone/style_guide_v19.7.9.xml'
+        ]
+        for filepath in standalone_files:
+            if os.path.exists(filepath):
+                files.append(filepath)
+            else:
+                print(f"Not found: {filepath}")
+        files += sorted(str(p) for p in Path('project_knowledge').glob('*.xml'))
+
+    started = time.perf_counter()
+    reports = repair_batch(files, args.jobs or os.cpu_count() or 1)
+    ok = print_report(reports, time.perf_counter() - started)
+    return 0 if ok else 1
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+health_check.py - XEREX System Health Check v19.7.9
+Runs every probe concurrently over one shared read of the documents and reports
+per-probe wall time, as a terminal report or as JSON for monitoring
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics_ledger import MetricsLedger, drift, percent
+from validate_xerex import EXPECTED_VERSION, inspect_data
+from version_sync import location, scan
+from xerex_index import knowledge_files
+from xerex_profile import Profiler
+
+Probe = namedtuple('Probe', 'id title func')
+# Each line of a probe's report: (status, message)
+OK, WARN, FAIL = 'ok', 'warn', 'fail'
+ICONS = {OK: '✅', WARN: '⚠️ ', FAIL: '❌'}
+COLORS = {OK: '\033[0;32m', WARN: '\033[1;33m', FAIL: '\033[0;31m'}
+NC = '\033[0m'
+
+# Registered probes, in report order
+PROBES = []
+
+EXPECTED_FILES = [
+    f"standalone/personal_preferences_v{EXPECTED_VERSION}.xml",
+    f"standalone/project_instructions_v{EXPECTED_VERSION}.xml",
+    f"standalone/style_guide_v{EXPECTED_VERSION}.xml",
+    f"project_knowledge/safety_core_v{EXPECTED_VERSION}.xml",
+    f"project_knowledge/pattern_engine_v{EXPECTED_VERSION}.xml",
+    f"project_knowledge/system_intelligence_v{EXPECTED_VERSION}.xml",
+    f"project_knowledge/audit_center_v{EXPECTED_VERSION}.xml",
+    f"project_knowledge/testing_suite_v{EXPECTED_VERSION}.xml",
+]
+
+def probe(probe_id, title):
+    """Register func(docs) -> [(status, message), ...] as a health probe"""
+    def register(func):
+        PROBES.append(Probe(probe_id, title, func))
+        return func
+    return register
+
+class DocumentSet:
+    """Every knowledge document read once and shared by the probes"""
+
+    def __init__(self, files):
+        self.files = list(files)
+        # Per-check timings of the validator probe, exported in the JSON report
+        self.profiler = Profiler()
+        self.contents = {}
+        self.errors = {}
+        for filepath in self.files:
+            try:
+                with open(filepath, 'rb') as f:
+                    self.contents[filepath] = f.read()
+            except OSError as e:
+                self.errors[filepath] = str(e)
+
+def git(*args):
+    """stdout of a git command, or None if git fails"""
+    try:
+        proc = subprocess.run(('git',) + args, capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return proc.stdout if proc.returncode == 0 else None
+
+@probe('validator', "VALIDATOR CHECK")
+def check_validator(docs):
+    lines = []
+    for filepath in docs.files:
+        if filepath in docs.errors:
+            lines.append((FAIL, f"{filepath}: {docs.errors[filepath]}"))
+            continue
+        valid, results, _ = inspect_data(docs.contents[filepath], docs.profiler)
+        if not valid:
+            lines.append((FAIL, f"{filepath}:"))
+            lines.extend((FAIL, f"  {result}") for result in results)
+    if not docs.files:
+        return [(FAIL, "No XML files found")]
+    if not lines:
+        return [(OK, "All files passing validation")]
+    return [(FAIL, "Validation failures detected")] + lines
+
+# git, hooks and remotes describe this checkout, not the documents: their
+# probes warn at worst, so only document problems make the exit status 1
+@probe('git_status', "GIT STATUS")
+def check_git_status(docs):
+    status = git('status', '--porcelain')
+    if status is None:
+        return [(WARN, "Not a git repository")]
+    if not status.strip():
+        return [(OK, "Repository clean")]
+    return [(WARN, "Uncommitted changes:")] + [(WARN, line) for line in status.splitlines()]
+
+@probe('hooks', "PRE-COMMIT HOOKS")
+def check_hooks(docs):
+    if os.path.isfile('.git/hooks/pre-commit'):
+        return [(OK, "Hooks installed")]
+    return [(WARN, "Hooks not installed"), (WARN, "Run: pre-commit install")]
+
+@probe('versions', "VERSION CONSISTENCY")
+def check_versions(docs):
+    report = scan(docs.files, contents=docs.contents)
+    if report.consistent:
+        return [(OK, report.summary())]
+    lines = [(FAIL, report.summary())]
+    lines += [(FAIL, f"{location(occ)}: {occ.kind} {occ.version}") for occ in report.errors]
+    lines += [(FAIL, f"{filepath}: {error}") for filepath, error in report.unreadable]
+    return lines
+
+@probe('metrics', "METRICS LEDGER")
+def check_metrics(docs):
+    ledger = MetricsLedger(writable=False)
+    if not ledger.exists():
+        return [(WARN, "No metrics ledger - run metrics_ledger.py to seed it")]
+    metrics = ledger.current()
+    lines = [(OK, f"Session {metrics.session}: trust {percent(metrics.trust)}, "
+                  f"health {percent(metrics.health)} ({len(ledger)} records)")]
+    for filepath, data in docs.contents.items():
+        try:
+            root = ET.fromstring(data)
+        except ET.ParseError:
+            # the validator probe reports it
+            continue
+        for _, path, attr, old, new in drift(root, metrics):
+            field = f"{path}@{attr}" if attr else path
+            lines.append((WARN, f"{filepath}: {field} is {old}, ledger says {new}"))
+    return lines
+
+@probe('files', "FILE STRUCTURE")
+def check_files(docs):
+    missing = [(FAIL, f"Missing: {f}") for f in EXPECTED_FILES if not os.path.isfile(f)]
+    return missing or [(OK, "All required files present")]
+
+@probe('github', "GITHUB CONNECTION")
+def check_github(docs):
+    remotes = git('remote', '-v')
+    if not remotes or 'github.com' not in remotes:
+        return [(WARN, "No GitHub remote found")]
+    lines = [(OK, "GitHub remote configured")]
+    unpushed = git('log', 'origin/main..HEAD', '--oneline')
+    count = len(unpushed.splitlines()) if unpushed else 0
+    if count == 0:
+        lines.append((OK, "All changes pushed"))
+    else:
+        lines.append((WARN, f"{count} commits not pushed"))
+    return lines
+
+@probe('environment', "PYTHON ENVIRONMENT")
+def check_environment(docs):
+    lines = []
+    # find_spec only looks the modules up; nothing is imported to check them
+    if importlib.util.find_spec('pyexpat') is not None:
+        lines.append((OK, "XML parsing available"))
+    else:
+        lines.append((FAIL, "XML module missing"))
+    if importlib.util.find_spec('numpy') is not None:
+        lines.append((OK, "numpy available (verification scorer, trust engine)"))
+    else:
+        lines.append((WARN, "numpy not found - verification_score.py and trust_engine.py will not run"))
+    if shutil.which('pre-commit'):
+        lines.append((OK, "pre-commit installed"))
+    else:
+        lines.append((WARN, "pre-commit not found"))
+    return lines
+
+def worst(lines):
+    statuses = {status for status, _ in lines}
+    return FAIL if FAIL in statuses else WARN if WARN in statuses else OK
+
+def run_probe(spec, docs):
+    start = time.perf_counter()
+    try:
+        lines = spec.func(docs)
+    except Exception as e:
+        lines = [(FAIL, f"Probe crashed: {e}")]
+    return {'id': spec.id, 'title': spec.title, 'status': worst(lines),
+            'seconds': time.perf_counter() - start,
+            'lines': [{'status': s, 'message': m} for s, m in lines]}
+
+def run_health(files=None, jobs=None):
+    """Run every probe concurrently; returns the report dict"""
+    start = time.perf_counter()
+    docs = DocumentSet(knowledge_files() if files is None else files)
+    loaded = time.perf_counter() - start
+    with ThreadPoolExecutor(max_workers=jobs or len(PROBES)) as pool:
+        probes = list(pool.map(lambda spec: run_probe(spec, docs), PROBES))
+    return {
+        'version': EXPECTED_VERSION,
+        'status': worst([(p['status'], '') for p in probes]),
+        'seconds': time.perf_counter() - start,
+        'load_seconds': loaded,
+        'files': len(docs.files),
+        'probes': probes,
+        'profile': docs.profiler.summary(),
+    }
+
+def print_report(report, color=True):
+    def paint(status, text):
+        return f"{COLORS[status]}{text}{NC}" if color else text
+
+    print("=" * 50)
+    print(f"🤖 XEREX SYSTEM HEALTH CHECK v{report['version']}")
+    print("=" * 50)
+    for number, result in enumerate(report['probes'], 1):
+        print(f"\n{number}. {result['title']}: ({result['seconds'] * 1000:.1f} ms)")
+        for line in result['lines']:
+            status, message = line['status'], line['message']
+            print(f"   {paint(status, ICONS[status] + ' ' + message)}")
+
+    print("\n" + "=" * 50)
+    print("SUMMARY:")
+    print(f"{report['files']} documents read once in {report['load_seconds'] * 1000:.1f} ms; "
+          f"{len(report['probes'])} probes in {report['seconds'] * 1000:.1f} ms wall time")
+    slowest = max(report['probes'], key=lambda p: p['seconds'])
+    print(f"Slowest probe: {slowest['title'].lower()} ({slowest['seconds'] * 1000:.1f} ms)")
+    if report['status'] == OK:
+        print("All green = Ready for production use!")
+    elif report['status'] == WARN:
+        print("Warnings only - review before production use")
+    else:
+        print("Failures found - fix before production use")
+    print("=" * 50)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="XEREX system health check")
+    parser.add_argument('files', nargs='*',
+                        help="XML files (default: standalone/ and project_knowledge/)")
+    parser.add_argument('--json', action='store_true',
+                        help="print one JSON report for monitoring instead of text")
+    parser.add_argument('-j', '--jobs', type=int, default=0,
+                        help="probe threads (0 = one per probe)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    report = run_health(args.files or None, args.jobs)
+    if args.json:
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        print_report(report, color=sys.stdout.isatty())
+    return 1 if report['status'] == FAIL else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+metrics_ledger.py - The one source of trust, health, implementation and context
+An append-only ledger of per-response deltas (update_protocol's "new_value =
+current + delta") whose header carries the running totals, so the current
+metrics are read without replaying history; canonical_metrics and every
+document that repeats them are regenerated from it
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+import xml.etree.ElementTree as ET
+from array import array
+from collections import namedtuple
+from functools import partial
+from pathlib import Path
+
+from validate_xerex import EXPECTED_VERSION
+from xml_patch import PatchDocument
+
+LEDGER_PATH = Path('metrics.ledger')
+SAFETY_CORE_PATH = Path('project_knowledge') / f"safety_core_v{EXPECTED_VERSION}.xml"
+SOURCE_DIR = Path('project_knowledge')
+
+METRICS = ('trust', 'health', 'implementation', 'context')
+# Record kinds: a seed or correction, an ordinary response, a perfect one.
+# Adjustments move the session's starting point too, so they never show up
+# as progress made during the session
+ADJUST, RESPONSE, PERFECT = 0.0, 1.0, 2.0
+
+# Every record is the same run of doubles, so the file body is one array('d').
+# No wall-clock field: the same history always gives the same bytes, so the
+# committed ledger only changes when the metrics do
+RECORD_FIELDS = ('session', 'kind') + METRICS
+RECORD = struct.Struct(f'<{len(RECORD_FIELDS)}d')
+MAGIC = b'XRXLDG2\0'
+# Earlier formats share the first six bytes
+MAGIC_FAMILY = MAGIC[:6]
+# magic, records, responses and perfect responses this session, session,
+# running totals, totals when the session started
+HEADER = struct.Struct(f'<8sQQQd{len(METRICS)}d{len(METRICS)}d')
+
+PERCENT_RE = re.compile(r'\s*([+-]?\d+(?:\.\d+)?)\s*%?')
+
+Metrics = namedtuple('Metrics', 'session responses perfect ' + ' '.join(METRICS) +
+                     ' ' + ' '.join(f'{m}_delta' for m in METRICS))
+
+def percent(value):
+    """55.0 -> '55%', 55.5 -> '55.5%'"""
+    return f"{round(value, 2) + 0.0:g}%"
+
+def signed(value):
+    return f"{round(value, 2) + 0.0:+g}%"
+
+def parse_percent(text):
+    m = PERCENT_RE.match(text or '')
+    if not m:
+        raise ValueError(f"Not a percentage: {text!r}")
+    return float(m.group(1))
+
+class MetricsLedger:
+    """Append-only, fixed-width records behind a header of running totals
+
+    record() writes the new record past the last one and then rewrites the
+    header in place, so current() never reads more than the header. If a
+    write was cut short between the two, the records the header has not
+    counted yet are replayed when the ledger is next opened, and the
+    header is repaired unless it was opened with writable=False, which
+    keeps the replay in memory and refuses record().
+    """
+
+    def __init__(self, path=LEDGER_PATH, writable=True):
+        self.path = Path(path)
+        self.writable = writable
+        self.count = 0
+        self.responses = 0
+        self.perfect = 0
+        self.session = 0
+        self.totals = [0.0] * len(METRICS)
+        self.session_base = [0.0] * len(METRICS)
+        try:
+            with open(self.path, 'rb') as f:
+                head = f.read(HEADER.size)
+                size = os.fstat(f.fileno()).st_size
+        except FileNotFoundError:
+            return
+        if head[:len(MAGIC)] != MAGIC and head.startswith(MAGIC_FAMILY):
+            raise ValueError(f"{self.path} is an older ledger format; move it aside to re-seed it")
+        if len(head) < HEADER.size or head[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a metrics ledger")
+        fields = HEADER.unpack(head)
+        n = len(METRICS)
+        self.count, self.responses, self.perfect = fields[1:4]
+        self.session = fields[4]
+        self.totals = list(fields[5:5 + n])
+        self.session_base = list(fields[5 + n:])
+        stored = (size - HEADER.size) // RECORD.size
+        if stored < self.count:
+            raise ValueError(f"{self.path} is truncated: {stored} of {self.count} records")
+        if stored > self.count:
+            self._replay(self.history()[self.count * len(RECORD_FIELDS):])
+            if writable:
+                self._write_header()
+
+    def __len__(self):
+        return self.count
+
+    def exists(self):
+        return self.path.exists()
+
+    def _apply(self, row):
+        session, kind = row[:2]
+        if session != self.session:
+            self.session = session
+            self.session_base = list(self.totals)
+            self.responses = self.perfect = 0
+        for i, delta in enumerate(row[2:]):
+            self.totals[i] += delta
+            if kind == ADJUST:
+                self.session_base[i] += delta
+        if kind >= RESPONSE:
+            self.responses += 1
+        if kind == PERFECT:
+            self.perfect += 1
+        self.count += 1
+
+    def _replay(self, rows):
+        width = len(RECORD_FIELDS)
+        for offset in range(0, len(rows), width):
+            self._apply(rows[offset:offset + width])
+
+    def _write_header(self):
+        data = HEADER.pack(MAGIC, self.count, self.responses, self.perfect, self.session,
+                           *self.totals, *self.session_base)
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(fd, data, 0)
+        finally:
+            os.close(fd)
+
+    def record(self, kind=RESPONSE, session=None, **deltas):
+        """Append one record of metric deltas; returns the new current()"""
+        if not self.writable:
+            raise ValueError(f"{self.path} was opened read-only")
+        unknown = set(deltas) - set(METRICS)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {', '.join(sorted(unknown))}")
+        row = [self.session if session is None else float(session), float(kind)]
+        row += [float(deltas.get(metric, 0.0)) for metric in METRICS]
+        if not self.count:
+            self._write_header()
+        fd = os.open(self.path, os.O_WRONLY)
+        try:
+            # Past the last counted record, over any half-written one
+            os.pwrite(fd, RECORD.pack(*row), HEADER.size + self.count * RECORD.size)
+        finally:
+            os.close(fd)
+        self._apply(row)
+        self._write_header()
+        return self.current()
+
+    def seed(self, session, **values):
+        """Start an empty ledger at the given absolute values"""
+        if self.count:
+            raise ValueError(f"{self.path} already has {self.count} records")
+        return self.record(ADJUST, session, **values)
+
+    def current(self):
+        """The current metrics and this session's deltas, from the running totals"""
+        deltas = [total - base for total, base in zip(self.totals, self.session_base)]
+        return Metrics(int(self.session), self.responses, self.perfect, *self.totals, *deltas)
+
+    def history(self):
+        """Every record as one flat array('d'), RECORD_FIELDS per record"""
+        rows = array('d')
+        with open(self.path, 'rb') as f:
+            f.seek(HEADER.size)
+            data = f.read()
+        rows.frombytes(data[:len(data) - len(data) % RECORD.size])
+        if sys.byteorder != 'little':
+            rows.byteswap()
+        return rows
+
+# canonical_metrics children, in METRICS order, and the attribute holding each value
+CANONICAL = [
+    ('trust_level', 'value'),
+    ('system_health', 'value'),
+    ('implementation_rate', 'value'),
+    ('context_usage', 'value'),
+]
+
+def seed_values(path=SAFETY_CORE_PATH):
+    """(session, {metric: value}) from safety_core's hand-kept canonical_metrics"""
+    canonical = ET.parse(path).getroot().find('.//canonical_metrics')
+    if canonical is None:
+        raise ValueError(f"No canonical_metrics in {path}")
+    values = {}
+    for metric, (tag, attr) in zip(METRICS, CANONICAL):
+        elem = canonical.find(tag)
+        if elem is None:
+            raise ValueError(f"No canonical_metrics/{tag} in {path}")
+        values[metric] = parse_percent(elem.get(attr))
+    session = canonical.find('session_number')
+    if session is None or not (session.get('value') or '').strip().isdigit():
+        raise ValueError(f"No canonical_metrics/session_number value in {path}")
+    return int(session.get('value')), values
+
+# Where documents repeat the metrics: (element path, attribute or None for
+# text, field). Paths that a document does not contain are skipped.
+TARGETS = [(f'.//canonical_metrics/{tag}', attr, metric)
+           for (tag, attr), metric in zip(CANONICAL, METRICS)] + [
+    ('.//canonical_metrics/session_number', 'value', 'session'),
+    ('.//dynamic_metrics_module/current_session/session_number', None, 'session'),
+    ('.//dynamic_metrics_module/current_session/trust_level', 'value', 'trust'),
+    ('.//dynamic_metrics_module/current_session/system_health', 'value', 'health'),
+    ('.//dynamic_metrics_module/current_session/implementation_rate', 'value', 'implementation'),
+    ('.//dynamic_metrics_module/current_session/context_usage', 'value', 'context'),
+    ('.//dynamic_metrics_module/session_tracking/response_count', None, 'responses'),
+    ('.//dynamic_metrics_module/session_tracking/perfect_responses', None, 'perfect'),
+    ('.//dynamic_metrics_module/session_tracking/trust_delta', None, 'trust_delta'),
+    ('.//dynamic_metrics_module/session_tracking/health_delta', None, 'health_delta'),
+    ('.//dynamic_metrics_module/current_trust', None, 'trust'),
+    ('.//dynamic_metrics_module/current_health', None, 'health'),
+    ('.//dynamic_metrics_module/current_implementation', None, 'implementation'),
+    ('.//dynamic_metrics_module/session_delta', None, 'session_delta'),
+]
+
+def document_values(metrics):
+    """Each TARGETS field as the document writes it"""
+    values = {metric: percent(getattr(metrics, metric)) for metric in METRICS}
+    values.update({f'{metric}_delta': signed(getattr(metrics, f'{metric}_delta'))
+                   for metric in METRICS})
+    values.update(session=str(metrics.session), responses=str(metrics.responses),
+                  perfect=str(metrics.perfect),
+                  session_delta=f"{values['trust_delta']} trust, "
+                                f"{values['health_delta']} health this session")
+    return values
+
+def drift(root, metrics):
+    """(element, path, attribute, document value, ledger value) for every stale value"""
+    values = document_values(metrics)
+    stale = []
+    for path, attr, field in TARGETS:
+        for elem in root.findall(path):
+            if attr and attr not in elem.attrib:
+                # A pointer like <trust_level>Dynamic tracking ...</trust_level>, not a copy
+                continue
+            old = elem.get(attr) if attr else (elem.text or '').strip()
+            if old != values[field]:
+                stale.append((elem, path[3:], attr, old, values[field]))
+    return stale
+
+def sync_file(filepath, metrics, apply=False):
+    """Stale values in one document, rewritten from the ledger if apply"""
+    with PatchDocument(filepath) as doc:
+        stale = drift(doc.root, metrics)
+        if apply and stale:
+            for elem, _, attr, _, new in stale:
+                if attr:
+                    doc.set_attribute(elem, attr, new)
+                else:
+                    doc.set_text(elem, new)
+            doc.write()
+    return [entry[1:] for entry in stale]
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Record and publish the XEREX dynamic metrics")
+    parser.add_argument('files', nargs='*',
+                        help=f"documents to keep in step (default: {SOURCE_DIR}/*.xml)")
+    parser.add_argument('--ledger', default=str(LEDGER_PATH),
+                        help="ledger file (default: %(default)s)")
+    for metric in METRICS:
+        parser.add_argument(f'--{metric}', type=parse_percent, metavar='DELTA',
+                            help=f"record a response changing {metric} by DELTA (e.g. +0.5)")
+    parser.add_argument('--perfect', action='store_true', help="the recorded response was perfect")
+    parser.add_argument('--session', type=int, help="start this session before recording")
+    parser.add_argument('--apply', action='store_true',
+                        help="rewrite the documents' values from the ledger")
+    parser.add_argument('--json', action='store_true', help="print the current metrics as JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    files = args.files or sorted(str(p) for p in SOURCE_DIR.glob('*.xml'))
+    log = partial(print, file=sys.stderr) if args.json else print
+
+    try:
+        ledger = MetricsLedger(args.ledger)
+        if not ledger.exists():
+            session, values = seed_values()
+            ledger.seed(session, **values)
+            log(f"✓ Seeded {args.ledger} from {SAFETY_CORE_PATH} canonical_metrics")
+        if args.session is not None and args.session != ledger.session:
+            ledger.record(ADJUST, args.session)
+        deltas = {m: getattr(args, m) for m in METRICS if getattr(args, m) is not None}
+        if deltas or args.perfect:
+            ledger.record(PERFECT if args.perfect else RESPONSE, **deltas)
+    except (OSError, ET.ParseError, ValueError) as e:
+        log(f"❌ {e}")
+        return 1
+    metrics = ledger.current()
+
+    if args.json:
+        json.dump({'records': len(ledger), **metrics._asdict()}, sys.stdout, indent=2)
+        print()
+    else:
+        print("=" * 60)
+        print(f"📈 XEREX METRICS LEDGER v{EXPECTED_VERSION}")
+        print("=" * 60)
+        print(f"Session {metrics.session}: {metrics.responses} responses "
+              f"({metrics.perfect} perfect), {len(ledger)} records")
+        for metric in METRICS:
+            print(f"  {metric:<15} {percent(getattr(metrics, metric)):>7}  "
+                  f"({signed(getattr(metrics, metric + '_delta'))} this session)")
+        print()
+
+    stale = 0
+    for filepath in files:
+        try:
+            changes = sync_file(filepath, metrics, args.apply)
+        except (OSError, ET.ParseError) as e:
+            log(f"❌ {filepath}: {e}")
+            return 1
+        stale += len(changes)
+        for path, attr, old, new in changes:
+            field = f"{path}@{attr}" if attr else path
+            log(f"  {'✓' if args.apply else '⚠️'} {filepath}: {field} {old!r} -> {new!r}")
+
+    if not stale:
+        log("✅ Every document matches the ledger")
+        return 0
+    if args.apply:
+        log(f"✅ {stale} values rewritten from the ledger")
+        return 0
+    log(f"⚠️ {stale} values disagree with the ledger - run with --apply to rewrite them")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
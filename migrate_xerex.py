@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+migrate_xerex.py - Brings XEREX documents up to the current release
+Runs the ordered chain of registered migrations a file still needs, keyed on its
+<current_version>; every step edits one PatchDocument, so however many steps
+apply only the changed byte ranges are written
+"""
+
+import xml.etree.ElementTree as ET
+import argparse
+import os
+import re
+import shutil
+import sys
+from collections import Counter, namedtuple
+from pathlib import Path
+
+from rewrite_rules import RuleSet
+from xml_patch import PatchDocument
+
+Migration = namedtuple('Migration', 'source target rules func')
+
+# source version -> Migration; each step moves a document one release forward
+MIGRATIONS = {}
+
+# Elements that record the version a document is at; history text is left alone
+VERSION_FIELDS = ('current_version', 'version', 'latest_version')
+FILENAME_VERSION_RE = re.compile(r'_v(\d+(?:\.\d+)*)(?=\.xml$)')
+
+def migration(source, target, rules=()):
+    """Register the step from source to target
+
+    rules are literal (old, new) replacements applied in one pass over
+    every element's text and attribute values and every comment; the decorated
+    func(doc, filepath, notes) makes any structural edits through the
+    PatchDocument doc, appending a line to notes for each change. The
+    version fields themselves are bumped by the runner, not the step.
+    """
+    def register(func):
+        if source in MIGRATIONS:
+            raise ValueError(f"Two migrations from {source}")
+        MIGRATIONS[source] = Migration(source, target, RuleSet(rules), func)
+        return func
+    return register
+
+def latest_version():
+    """The version at the end of the migration chain"""
+    targets = {m.target for m in MIGRATIONS.values()}
+    ends = targets - set(MIGRATIONS)
+    if len(ends) != 1:
+        raise ValueError(f"Migration chain has {len(ends)} ends: {sorted(ends)}")
+    return ends.pop()
+
+def migration_path(version, target):
+    """The ordered steps from version to target ([] if already there)"""
+    steps = []
+    while version != target:
+        step = MIGRATIONS.get(version)
+        if step is None:
+            raise ValueError(f"No migration from {version} towards {target}")
+        steps.append(step)
+        version = step.target
+        if len(steps) > len(MIGRATIONS):
+            raise ValueError("Migration chain has a cycle")
+    return steps
+
+# ---- Migrations, oldest first ----
+
+NEW_FORMULA = '(input_tokens + output_tokens) / 200,000 × 100'
+
+@migration('19.7.6', '19.7.7', rules=[
+    # Context formula (handle various formats, including the mis-decoded one)
+    ('(Characters ÷ 800,000) × 100 - 25%', NEW_FORMULA),
+    ('(Characters Ã· 800,000) Ã— 100 - 25%', NEW_FORMULA),
+    ('Characters ÷ 800,000', NEW_FORMULA),
+    ('Characters / 800,000', NEW_FORMULA),
+    # Rule #6
+    ("Catch Scott's mistakes", "Catch mistakes proactively"),
+])
+def token_based_context(doc, filepath, notes):
+    """v19.7.7: token-based context formula, session 9, canonical trust"""
+    root = doc.root
+    # Personal Preferences needs its 8th rule
+    rules = root.find('.//behavioral_rules')
+    if ('personal_preferences' in str(filepath) and rules is not None
+            and rules.find('rule_7') is not None and rules.find('rule_8') is None):
+        doc.append(rules, '<rule_8>-2% trust if ANY rule not displayed</rule_8>')
+        notes.append("Added rule_8")
+
+    sessions = [elem for elem in root.iter('session_created') if (elem.text or '').strip() == '8']
+    for elem in sessions:
+        doc.set_text(elem, elem.text.replace('8', '9'))
+    if sessions:
+        notes.append("Updated session to 9")
+
+    trust = next((elem for elem in root.iter('trust_level') if elem.get('value') == '64%'), None)
+    if trust is not None:
+        doc.set_attribute(trust, 'value', '94%')
+        notes.append("Updated trust to 94%")
+
+    improvements = root.find('.//improvements')
+    if improvements is not None:
+        doc.append(improvements,
+                   '<improvement>Fixed context formula to token-based calculation</improvement>')
+        notes.append("Added context fix note")
+
+@migration('19.7.7', '19.7.8')
+def version_only_19_7_8(doc, filepath, notes):
+    """v19.7.8: version corrected throughout; nothing else was scripted"""
+
+@migration('19.7.8', '19.7.9')
+def version_only_19_7_9(doc, filepath, notes):
+    """v19.7.9: context headers and metrics were added by hand; version bump only"""
+
+# ---- Runner ----
+
+def apply_step(step, doc, filepath, notes):
+    """One migration's rules and edits (not the version bump) on doc"""
+    hits = Counter()
+    if len(step.rules):
+        for elem in doc.root.iter():
+            if elem.text:
+                text, found = step.rules.subn(elem.text)
+                if found:
+                    doc.set_text(elem, text)
+                    hits.update(found)
+            for name, value in list(elem.attrib.items()):
+                value, found = step.rules.subn(value)
+                if found:
+                    doc.set_attribute(elem, name, value)
+                    hits.update(found)
+        for comment in doc.comments:
+            text, found = step.rules.subn(comment.text)
+            if found:
+                doc.set_comment(comment, text)
+                hits.update(found)
+    for old, count in hits.items():
+        notes.append(f"{step.target}: replaced {old!r} x{count}")
+    step_notes = []
+    step.func(doc, filepath, step_notes)
+    notes.extend(f"{step.target}: {note}" for note in step_notes)
+
+def migrate_document(doc, filepath, target):
+    """Record on doc every edit it needs to reach target
+
+    Returns (from version, notes); from version is None when the document
+    has no <current_version> to say where it stands.
+    """
+    current = doc.root.find('.//current_version')
+    if current is None or not (current.text or '').strip():
+        return None, []
+    version = current.text.strip()
+    steps = migration_path(version, target)
+    notes = []
+    for step in steps:
+        apply_step(step, doc, filepath, notes)
+
+    if steps:
+        # Any version field still at a release this chain passed through
+        passed = {step.source for step in steps}
+        for elem in doc.root.iter():
+            old = (elem.text or '').strip()
+            if elem.tag in VERSION_FIELDS and old in passed:
+                doc.set_text(elem, elem.text.replace(old, target, 1))
+        notes.append(f"Version {version} → {target}")
+    return version, notes
+
+def migrated_path(filepath, target):
+    """safety_core_v19.7.6.xml -> safety_core_v19.7.9.xml"""
+    path = Path(filepath)
+    return path.with_name(FILENAME_VERSION_RE.sub(f'_v{target}', path.name))
+
+def migrate_file(filepath, target, dry_run=False):
+    """Migrate one file; returns (from version, notes, written path or None)
+
+    Raises FileExistsError, touching nothing, if the renamed output would
+    replace another file.
+    """
+    with PatchDocument(filepath) as doc:
+        version, notes = migrate_document(doc, filepath, target)
+        if not doc.changed:
+            return version, notes, None
+
+        output = migrated_path(filepath, target)
+        if output.exists() and output.resolve() != Path(filepath).resolve():
+            # Never replace a document that is already at the new name
+            raise FileExistsError(f"{output} already exists; move it aside to migrate {filepath}")
+        if dry_run:
+            return version, notes, None
+        shutil.copy2(filepath, str(filepath) + '.backup')
+        # Untouched ranges are copied, not decoded and rewritten
+        doc.write(output)
+    if Path(output).resolve() != Path(filepath).resolve():
+        os.unlink(filepath)
+    return version, notes, output
+
+def default_files():
+    files = []
+    for directory in ('.', 'standalone', 'project_knowledge'):
+        files += sorted(str(p) for p in Path(directory).glob('*.xml'))
+    return files
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Migrate XEREX documents to a newer release")
+    parser.add_argument('files', nargs='*',
+                        help="XML files (default: ./, standalone/ and project_knowledge/)")
+    parser.add_argument('--to', dest='target', metavar='VERSION',
+                        help="target version (default: latest migration)")
+    parser.add_argument('-n', '--dry-run', action='store_true',
+                        help="show what would change without writing")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    target = args.target or latest_version()
+    files = args.files or default_files()
+
+    print("=" * 60)
+    print(f"XEREX MIGRATION → v{target}" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 60)
+
+    if not files:
+        print("\n❌ No XML files found!")
+        return 1
+
+    failed = 0
+    migrated = 0
+    for filepath in files:
+        print(f"\n{filepath}")
+        try:
+            version, notes, output = migrate_file(filepath, target, args.dry_run)
+        except (OSError, ET.ParseError, ValueError) as e:
+            print(f"  ❌ {e}")
+            failed += 1
+            continue
+        if version is None:
+            print("  ⚠️ No <current_version>, skipped")
+        elif not notes:
+            print(f"  ✓ Already at v{version}")
+        else:
+            migrated += 1
+            for note in notes:
+                print(f"  ✓ {note}")
+            if output is not None:
+                print(f"  ✓ Saved as: {output}")
+
+    print("\n" + "=" * 60)
+    verb = "would migrate" if args.dry_run else "migrated"
+    print(f"{migrated} file(s) {verb}, {failed} failed")
+    if migrated and not args.dry_run:
+        print("Now run: python3 validate_xerex.py")
+    return 0 if not failed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+pattern_engine.py - Runs the pattern_engine catalogue against response logs
+Loads the catalogue once, compiles every pattern's detectors into one combined
+matcher, and scans transcripts in a single linear pass, reporting activation
+rates in the current="N%" form the document uses
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter, namedtuple
+from pathlib import Path
+
+from validate_xerex import EXPECTED_VERSION
+from xerex_logs import batches, map_bounded, response_text
+
+CATALOGUE_PATH = Path('project_knowledge') / f"pattern_engine_v{EXPECTED_VERSION}.xml"
+
+Pattern = namedtuple('Pattern', 'id name current target description')
+
+PATTERN_TAG_RE = re.compile(r'pattern_(\d+)$')
+# 'Pattern #79: Documentation Without Implementation' inside the CDATA blocks
+ENTRY_RE = re.compile(r'^\s*Pattern #(\d+): (.+?)\s*$', re.M)
+DESCRIPTION_RE = re.compile(r'\s*- Description: (.+?)\s*$', re.M)
+
+_MAJOR, _, _REST = EXPECTED_VERSION.partition('.')
+
+# The catalogue describes patterns in prose; these are the textual markers
+# each one leaves in a response. Patterns without observable markers (logic
+# paradoxes, consciousness traps) have no detector and are not scanned for.
+# Detectors are lower case and matched against lowercased text, and each one
+# starts at a word boundary that compile_matcher() adds once for all of them.
+DETECTORS = {
+    'pattern_1': [  # Authority Trap
+        r"i(?:'m| am) (?:your|the) (?:creator|developer|admin(?:istrator)?|owner)\b",
+        r"(?:ignore|override) (?:all |your )?(?:previous |prior )?(?:instructions|rules)\b",
+    ],
+    'pattern_3': [  # Assumption Cascade
+        r"(?:assuming|presumably|i assume|it must be that)\b",
+    ],
+    'pattern_46': [  # Compression Psychosis
+        r"(?:removed|deleted|dropped|stripped) (?:the |all )?(?:safety|verification|validation) "
+        r"(?:checks?|features?|rules?)\b",
+        r"simplif(?:y|ied) (?:it )?by (?:removing|deleting)\b",
+    ],
+    'pattern_69': [  # Compound Error Cascade
+        r"(?:another|one more|yet another) (?:error|mistake|failure)\b",
+    ],
+    'pattern_74': [  # Oversimplification Trap
+        r"(?:just|simply) (?:remove|delete|skip|ignore)\b",
+    ],
+    'pattern_75': [  # Lazy Verification
+        r"(?:should|probably|likely) (?:work|be (?:fine|correct|working))\b",
+        r"i (?:think|believe) (?:this|it|that) (?:works|is (?:correct|fine|right))\b",
+        r"without (?:testing|checking|verifying)\b",
+        r"(?:haven't|have not|didn't|did not) (?:test|tested|check|checked|verify|verified)\b",
+    ],
+    'pattern_79': [  # Documentation Without Implementation
+        r"(?:todo|tbd|fixme)\b",
+        r"(?:will|to) be implemented\b",
+        r"implementation (?:left|omitted|to follow|pending)\b",
+        r"(?:placeholder|stub) (?:implementation|code|function)\b",
+    ],
+    'pattern_80': [  # Default Mode Dominance
+        r"as an ai(?: language model)?\b",
+        r"i hope this helps\b",
+    ],
+    'pattern_81': [  # Document Creation Amnesia
+        r"forgot to (?:create|save|write)\b",
+        r"i(?:'ll| will) create (?:the|an?|that) (?:artifact|document|file) (?:later|next time)\b",
+    ],
+    'pattern_89': [  # Version Sync Failure: any version in this line but the current one
+        rf"v?{_MAJOR}\.(?!{re.escape(_REST)}\b)\d+\.\d+\b",
+    ],
+    'pattern_92': [  # Context Explosion
+        r"(?:let me|i'll) (?:start over|try again|re-?do (?:this|that|it))\b",
+        r"as (?:i )?(?:mentioned|said|noted) (?:earlier|before|above)\b",
+    ],
+    'pattern_93': [  # Implementation Fade
+        r"(?:skipping|skipped|omitting|omitted) (?:the )?(?:rules?|trust|health) (?:display|check|header)\b",
+    ],
+}
+
+def load_catalogue(path=CATALOGUE_PATH):
+    """Every pattern the document defines, keyed 'pattern_N'
+
+    The <pattern_N name=".." current=".." target=".."> elements come first;
+    'Pattern #N: Name' entries in the CDATA blocks add the rest (with no
+    documented rate unless an element gave one).
+    """
+    root = ET.parse(path).getroot()
+    patterns = {}
+    for elem in root.iter():
+        m = PATTERN_TAG_RE.match(elem.tag)
+        if m and 'name' in elem.attrib:
+            patterns[elem.tag] = Pattern(elem.tag, elem.get('name'), elem.get('current'),
+                                         elem.get('target'), (elem.findtext('description') or '').strip())
+    for content in root.iter('document_content'):
+        text = content.text or ''
+        for m in ENTRY_RE.finditer(text):
+            pattern_id = f"pattern_{m.group(1)}"
+            if pattern_id in patterns:
+                continue
+            description = DESCRIPTION_RE.match(text, m.end())
+            patterns[pattern_id] = Pattern(pattern_id, m.group(2), None, None,
+                                           description.group(1) if description else '')
+    return patterns
+
+def compile_matcher(catalogue, detectors=DETECTORS):
+    """One regex for every detector; the named group that matched is the pattern id
+
+    One word-start test shared by every alternative, and lowercasing the
+    text instead of re.IGNORECASE, make the scan several times faster:
+    positions inside a word are rejected before any branch is tried.
+    """
+    unknown = sorted(set(detectors) - set(catalogue))
+    if unknown:
+        raise ValueError(f"Detectors for patterns not in the catalogue: {', '.join(unknown)}")
+    groups = [f"(?P<{pattern_id}>{'|'.join(f'(?:{regex})' for regex in regexes)})"
+              for pattern_id, regexes in detectors.items()]
+    return re.compile(r'(?<!\w)(?:' + '|'.join(groups) + ')')
+
+def scan_lines(matcher, lines):
+    """(responses, characters, Counter of responses each pattern fired in) for a batch"""
+    fired = Counter()
+    responses = chars = 0
+    for line in lines:
+        chars += len(line)
+        line = line.strip()
+        if not line:
+            continue
+        responses += 1
+        fired.update({m.lastgroup for m in matcher.finditer(response_text(line).lower())})
+    return responses, chars, fired
+
+class ScanResult:
+    """Running totals over every scanned batch"""
+
+    def __init__(self):
+        self.responses = 0
+        self.chars = 0
+        self.fired = Counter()
+        self.seconds = 0.0
+
+    def add(self, batch):
+        responses, chars, fired = batch
+        self.responses += responses
+        self.chars += chars
+        self.fired.update(fired)
+
+    def rate(self, pattern_id):
+        """Activation rate in the catalogue's 'N%' form"""
+        if not self.responses:
+            return '0%'
+        return f"{round(self.fired[pattern_id] * 100 / self.responses)}%"
+
+# Worker processes compile the matcher once, from its source
+_matcher = None
+
+def _init_worker(source):
+    global _matcher
+    _matcher = re.compile(source)
+
+def _scan_batch(lines):
+    return scan_lines(_matcher, lines)
+
+def scan(streams, matcher, jobs=1):
+    """Scan every line of every stream; returns a ScanResult"""
+    result = ScanResult()
+    start = time.perf_counter()
+    for batch in map_bounded(_scan_batch, batches(streams), jobs, _init_worker, (matcher.pattern,)):
+        result.add(batch)
+    result.seconds = time.perf_counter() - start
+    return result
+
+def report_rows(catalogue, result, detectors=DETECTORS):
+    """(pattern, measured rate) for every pattern with a detector, by pattern number"""
+    ids = sorted(detectors, key=lambda pattern_id: int(pattern_id.split('_')[1]))
+    return [(catalogue[pattern_id], result.rate(pattern_id)) for pattern_id in ids]
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Measure pattern activation in response logs")
+    parser.add_argument('logs', nargs='*',
+                        help="transcripts, one response per line, plain or JSON Lines (default: stdin)")
+    parser.add_argument('--catalogue', default=str(CATALOGUE_PATH),
+                        help="pattern_engine document (default: %(default)s)")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="worker processes (0 = one per CPU)")
+    parser.add_argument('--json', action='store_true', help="print the rates as JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    try:
+        catalogue = load_catalogue(args.catalogue)
+        matcher = compile_matcher(catalogue)
+    except (OSError, ET.ParseError, ValueError) as e:
+        print(f"❌ Cannot load pattern catalogue {args.catalogue}: {e}")
+        return 1
+
+    streams = [open(path, encoding='utf-8', errors='replace') for path in args.logs] or [sys.stdin]
+    try:
+        result = scan(streams, matcher, args.jobs or os.cpu_count() or 1)
+    finally:
+        for stream in streams:
+            if stream is not sys.stdin:
+                stream.close()
+    rows = report_rows(catalogue, result)
+
+    if args.json:
+        json.dump({'responses': result.responses, 'chars': result.chars, 'seconds': result.seconds,
+                   'patterns': {p.id: {'name': p.name, 'current': rate, 'documented': p.current,
+                                       'target': p.target, 'responses': result.fired[p.id]}
+                                for p, rate in rows}},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print("=" * 60)
+    print(f"🔍 XEREX PATTERN ENGINE v{EXPECTED_VERSION}")
+    print("=" * 60)
+    millions = result.chars / 1e6
+    rate = millions / result.seconds if result.seconds else 0
+    print(f"{len(catalogue)} patterns catalogued, {len(rows)} with detectors")
+    print(f"Scanned {result.responses:,} responses ({millions:.1f}M chars) in "
+          f"{result.seconds * 1000:.1f} ms ({rate:.1f}M chars/s)\n")
+    for pattern, rate in rows:
+        documented = f'  (documented current="{pattern.current}")' if pattern.current else ''
+        print(f'  {pattern.id:<11} {pattern.name:<38} current="{rate}"{documented}')
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+rewrite_rules.py - Applies a release's literal replacement rules in one pass
+Every rule is folded into a single trie-shaped regex, so a document is scanned
+once however many old formulas and version strings a release retires
+"""
+
+import re
+from collections import Counter
+
+def trie_pattern(words):
+    """One regex matching any of words, preferring the longest at each position
+
+    Words sharing a prefix share a branch ('Characters ÷ 800,000' and
+    '(Characters ÷ 800,000) × 100 - 25%' never re-scan 'Characters'), so
+    the regex engine does one trie walk per position instead of trying
+    every rule in turn.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+
+    def build(node):
+        branches = [re.escape(char) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A word ending here is the fallback once every longer branch fails
+        if '' in node:
+            return '(?:' + body + ')?'
+        return body
+
+    return build(trie)
+
+class RuleSet:
+    """Literal old -> new replacements compiled once, applied in one pass
+
+    Where two rules overlap the longer match wins, and replaced text is never
+    rescanned, so the result does not depend on the order rules are listed.
+    """
+
+    def __init__(self, rules):
+        self.rules = {}
+        for old, new in rules:
+            if not old:
+                raise ValueError("Replacement rule with an empty pattern")
+            if self.rules.get(old, new) != new:
+                raise ValueError(f"Conflicting replacements for {old!r}")
+            self.rules[old] = new
+        self.pattern = re.compile(trie_pattern(self.rules)) if self.rules else None
+
+    def __len__(self):
+        return len(self.rules)
+
+    def subn(self, text):
+        """Rewrite text; returns (new text, Counter of old strings replaced)"""
+        hits = Counter()
+        if self.pattern is None or not text:
+            return text, hits
+
+        def replace(m):
+            hits[m.group()] += 1
+            return self.rules[m.group()]
+
+        return self.pattern.sub(replace, text), hits
+
+    def sub(self, text):
+        return self.subn(text)[0]
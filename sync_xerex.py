@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+sync_xerex.py - Generates the standalone summaries from project_knowledge
+Each standalone file carries its knowledge document's real metadata and
+behavioral_rules, is validated in-process before it is written, and is only
+regenerated when the source content (or this template) changes
+"""
+
+import argparse
+import hashlib
+import os
+import re
+import sys
+from pathlib import Path
+
+from context_header import VERSION_SUFFIX_RE
+from validate_xerex import inspect_data
+from xerex_index import DocumentIndex
+from xerex_io import write_atomic
+
+SOURCE_DIR = Path('project_knowledge')
+OUTPUT_DIR = Path('standalone')
+
+TEMPLATE = """<?xml version="1.0" encoding="UTF-8"?>
+<xerex_document version="{version}">
+  <!-- Generated by sync_xerex.py from {source}; edit the source, not this file
+  source-sha256: {digest}
+  template: {template}
+  -->
+  <current_version>{version}</current_version>
+  {metadata}
+  {behavioral_rules}
+  <reference>See {source} for full content</reference>
+</xerex_document>
+"""
+TEMPLATE_ID = hashlib.sha256(TEMPLATE.encode('utf-8')).hexdigest()[:12]
+STAMP_RE = re.compile(rb'source-sha256: ([0-9a-f]{64})\s+template: ([0-9a-f]+)')
+# Generation stamps sit in the first few hundred bytes
+STAMP_BYTES = 1024
+
+def output_path(source, output_dir=OUTPUT_DIR):
+    """project_knowledge/safety_core_v19.7.9.xml -> standalone/safety_core.xml"""
+    stem = VERSION_SUFFIX_RE.sub('', Path(source).stem)
+    return Path(output_dir) / f"{stem}.xml"
+
+def generated_from(output):
+    """(source digest, template id) stamped in an existing output, or None"""
+    try:
+        with open(output, 'rb') as f:
+            m = STAMP_RE.search(f.read(STAMP_BYTES))
+    except OSError:
+        return None
+    return (m.group(1).decode(), m.group(2).decode()) if m else None
+
+def render(source, index):
+    """Standalone document text for one knowledge file, from its indexed sections"""
+    doc = index.lookup(source)
+    sections = {}
+    for key in ('metadata', 'behavioral_rules'):
+        fragment = doc.read(key)
+        if fragment is None:
+            raise ValueError(f"No <{key}> in {source}")
+        sections[key] = fragment.decode('utf-8')
+    version = (doc.text('current_version') or '').strip()
+    if not version:
+        raise ValueError(f"No <current_version> in {source}")
+    return TEMPLATE.format(version=version, source=Path(source).as_posix(),
+                           digest=index.digest(str(source)), template=TEMPLATE_ID, **sections)
+
+def sync_file(source, index, output_dir=OUTPUT_DIR, force=False):
+    """Regenerate one output if needed; returns (status, output, results)
+
+    status is 'skipped' (source unchanged), 'written', or 'invalid' when the
+    generated document failed validation and was not written.
+    """
+    output = output_path(source, output_dir)
+    stamp = (index.digest(str(source)), TEMPLATE_ID)
+    if not force and generated_from(output) == stamp:
+        return 'skipped', output, []
+
+    data = render(source, index).encode('utf-8')
+    valid, results, _ = inspect_data(data)
+    if not valid:
+        return 'invalid', output, results
+    write_atomic(output, data)
+    return 'written', output, results
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Generate standalone files from project_knowledge")
+    parser.add_argument('sources', nargs='*',
+                        help=f"knowledge documents (default: {SOURCE_DIR}/*.xml)")
+    parser.add_argument('-o', '--output-dir', default=str(OUTPUT_DIR),
+                        help=f"where to write the standalone files (default: {OUTPUT_DIR})")
+    parser.add_argument('-f', '--force', action='store_true',
+                        help="regenerate even when the source hash is unchanged")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    sources = args.sources or sorted(str(p) for p in SOURCE_DIR.glob('*.xml'))
+
+    print("🔄 XEREX Sync")
+    print("=" * 26)
+    if not sources:
+        print(f"❌ No knowledge documents in {SOURCE_DIR}/")
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    index = DocumentIndex()
+    counts = {'written': 0, 'skipped': 0, 'invalid': 0}
+    for source in sources:
+        try:
+            status, output, results = sync_file(source, index, args.output_dir, args.force)
+        except (OSError, ValueError) as e:
+            print(f"  ❌ {source}: {e}")
+            counts['invalid'] += 1
+            continue
+        counts[status] += 1
+        if status == 'skipped':
+            print(f"  = {output} (source unchanged)")
+        elif status == 'written':
+            print(f"  ✓ {output}")
+        else:
+            print(f"  ❌ {output} not written - generated document fails validation:")
+            for result in results:
+                print(f"      {result}")
+    index.save()
+
+    print(f"\n{counts['written']} written, {counts['skipped']} unchanged, {counts['invalid']} failed")
+    if counts['invalid']:
+        return 1
+    print("✅ Sync complete!")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+token_budget.py - Character and token budget accounting for XEREX documents
+Turns measured sizes into budget verdicts and writes them back to <character_count>
+"""
+
+import re
+import shutil
+
+from context_header import claimed_token_usage
+from xerex_io import AtomicFile
+
+# The documents pair 20,000-character limits with "5,000 token" headers
+CHARS_PER_TOKEN = 4
+# system_intelligence: Context% = (input_tokens + output_tokens) / 200,000 x 100
+CONTEXT_WINDOW_TOKENS = 200000
+# How far a header's "Token Usage" claim may drift from the measurement
+CLAIM_TOLERANCE = 0.10
+CHUNK_SIZE = 64 * 1024
+
+BLOCK_END = b'</character_count>'
+LIMIT_RE = re.compile(r'<limit>\s*(\d+)\s*</limit>')
+CURRENT_RE = re.compile(r'(<current>)[^<]*(</current>)')
+USAGE_RE = re.compile(r'(<usage>)[^<]*(</usage>)')
+
+def estimate_tokens(chars):
+    """Approximate token count for a number of characters"""
+    return -(-chars // CHARS_PER_TOKEN)
+
+def usage_percent(chars, limit):
+    return round(chars * 100 / limit) if limit else 0
+
+def check_budget(chars, limit=None, header=None, window=CONTEXT_WINDOW_TOKENS):
+    """Judge one document's measured size; returns (valid, message)
+
+    window is the context size in tokens the document must fit in; None
+    leaves only the declared limit to judge by.
+    """
+    tokens = estimate_tokens(chars)
+
+    if window and tokens > window:
+        return False, f"❌ ~{tokens:,} tokens exceeds the {window:,}-token context"
+
+    if limit:
+        measured = f"{chars:,}/{limit:,} chars ({usage_percent(chars, limit)}%, ~{tokens:,} tokens)"
+        if chars > limit:
+            return False, f"❌ Over budget: {measured}"
+    else:
+        measured = f"{chars:,} chars (~{tokens:,} tokens, no declared limit)"
+
+    claim = claimed_token_usage(header)
+    if claim and abs(claim[0] - tokens) > tokens * CLAIM_TOLERANCE:
+        return True, f"⚠️ Header claims ~{claim[0]:,} tokens, measured {measured}"
+
+    return True, f"✓ Budget: {measured}"
+
+def write_budget(filepath, chars):
+    """Store measured <current> and <usage> in the first <character_count>
+
+    Only the head of the file up to that block is decoded; the rest is
+    copied through unchanged into a temp file that replaces the original.
+    Returns the written character count, or None when nothing changed.
+    """
+    with open(filepath, 'rb') as src:
+        head = b''
+        while BLOCK_END not in head:
+            chunk = src.read(CHUNK_SIZE)
+            if not chunk:
+                return None
+            head += chunk
+
+        split = head.index(BLOCK_END) + len(BLOCK_END)
+        prefix = head[:split].decode('utf-8')
+        start = prefix.rfind('<character_count>')
+        if start < 0 or not CURRENT_RE.search(prefix, start):
+            return None
+        block = prefix[start:]
+        limit_match = LIMIT_RE.search(block)
+        limit = int(limit_match.group(1)) if limit_match else None
+
+        # Writing the numbers changes the size being recorded, so settle on
+        # a count that describes the file as it will be after the write
+        total = chars
+        for _ in range(5):
+            new_block = CURRENT_RE.sub(rf'\g<1>{total}\g<2>', block, count=1)
+            if limit:
+                new_block = USAGE_RE.sub(rf'\g<1>{usage_percent(total, limit)}%\g<2>', new_block, count=1)
+            settled = chars - len(block) + len(new_block)
+            if settled == total:
+                break
+            total = settled
+
+        if new_block == block:
+            return None
+
+        with AtomicFile(filepath, 'wb', like=filepath) as dst:
+            dst.write((prefix[:start] + new_block).encode('utf-8'))
+            dst.write(head[split:])
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+    return total
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+trust_engine.py - Replays per-response outcomes through safety_core's trust methodology
+Reads the modifier table from the TRUST CALCULATION METHODOLOGY block, turns an
+event log into a responses x events count matrix, and computes every session's
+trust trajectory under several modifier tables at once with one matrix product
+and a clamped running sum
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from metrics_ledger import SAFETY_CORE_PATH, parse_percent, percent, signed
+
+METHODOLOGY_HEADING = 'TRUST CALCULATION METHODOLOGY'
+# Only these sections of the block are modifiers; 'Session 12 History' is not
+MODIFIER_SECTIONS = ('Per-Response Modifiers', 'Specific Actions')
+BASE_RE = re.compile(r'Base Trust:\s*([+-]?\d+(?:\.\d+)?)%')
+# '- Perfect implementation: +0.5% to +1%' or '- Lying: -10%'
+MODIFIER_RE = re.compile(r'-\s*(.+?):\s*([+-]?\d+(?:\.\d+)?)%(?:\s+to\s+([+-]?\d+(?:\.\d+)?)%)?\s*$')
+SECTION_RE = re.compile(r'([A-Z][^:]*):\s*$')
+
+PERFECT = 'perfect_implementation'
+COMPOUND = 'compound_rate'
+# Which end of a '+0.5% to +1%' range a table uses, by magnitude
+BOUNDS = ('low', 'mid', 'high')
+# Trust is a percentage: every step is clamped into this range
+TRUST_MIN, TRUST_MAX = 0.0, 100.0
+
+# Outcome mix for --simulate: one quality grade per response, plus each
+# specific action independently at its rate
+SIMULATED_QUALITY = {'perfect_implementation': 0.40, 'good_implementation': 0.35,
+                     'poor_implementation': 0.20, 'critical_failure': 0.05}
+SIMULATED_ACTIONS = {'verification_language_95': 0.5, 'dynamic_metrics_shown': 0.6,
+                     'proactive_catch': 0.1, 'pattern_prevention': 0.2, 'lazy_mistake': 0.1,
+                     'hallucination': 0.02, 'lying': 0.005}
+
+ModifierTable = namedtuple('ModifierTable', 'name base modifiers')
+
+def slug(label):
+    """'Verification language 95%+' -> 'verification_language_95'"""
+    return re.sub(r'[^a-z0-9]+', '_', label.lower()).strip('_')
+
+def pick(low, high, bound):
+    if high is None:
+        return low
+    if bound == 'mid':
+        return (low + high) / 2
+    smaller, larger = sorted((low, high), key=abs)
+    return smaller if bound == 'low' else larger
+
+def load_table(path=SAFETY_CORE_PATH, bound='low'):
+    """The methodology's base trust and per-event modifiers as a ModifierTable
+
+    Ranges such as 'Critical failure: -2% to -5%' resolve to bound's end
+    (low = the smaller change). session_tracking's compound_rate is added
+    as COMPOUND, applied on top of the perfect response's own modifier.
+    """
+    root = ET.parse(path).getroot()
+    text = next((content.text for content in root.iter('document_content')
+                 if METHODOLOGY_HEADING in (content.text or '')), None)
+    if text is None:
+        raise ValueError(f"No {METHODOLOGY_HEADING} block in {path}")
+    base = BASE_RE.search(text)
+    if base is None:
+        raise ValueError(f"No 'Base Trust' in the {METHODOLOGY_HEADING} block")
+
+    modifiers = {}
+    section = None
+    for line in text.splitlines():
+        line = line.strip()
+        m = MODIFIER_RE.match(line)
+        if m and section in MODIFIER_SECTIONS:
+            high = float(m.group(3)) if m.group(3) else None
+            modifiers[slug(m.group(1))] = pick(float(m.group(2)), high, bound)
+            continue
+        m = SECTION_RE.match(line)
+        if m:
+            section = m.group(1)
+    if not modifiers:
+        raise ValueError(f"No modifiers in the {METHODOLOGY_HEADING} block")
+
+    compound = root.find('.//session_tracking/compound_rate')
+    if compound is not None:
+        modifiers[COMPOUND] = parse_percent(compound.text)
+    return ModifierTable(bound, float(base.group(1)), modifiers)
+
+def override(table, path):
+    """table with the base and modifiers in a JSON file replacing its own"""
+    with open(path, encoding='utf-8') as f:
+        spec = json.load(f)
+    modifiers = dict(table.modifiers)
+    modifiers.update({key: float(value) for key, value in spec.get('modifiers', {}).items()})
+    return ModifierTable(spec.get('name', path), float(spec.get('base', table.base)), modifiers)
+
+class EventLog:
+    """Every response as a row of event counts, grouped by session in log order
+
+    counts is responses x events (int32, columns named by events); starts
+    holds the row each session begins at.
+    """
+
+    def __init__(self, sessions, counts, events, names):
+        order = np.argsort(sessions, kind='stable')
+        self.sessions = sessions[order]
+        self.counts = counts[order]
+        self.events = list(events)
+        self.names = list(names)
+        self.starts = np.flatnonzero(np.diff(self.sessions, prepend=-1))
+        self.lengths = np.diff(np.append(self.starts, len(self.sessions)))
+
+    def __len__(self):
+        return len(self.sessions)
+
+    @classmethod
+    def read(cls, streams):
+        """From JSON Lines: {"session": .., "events": [..]} (or "event": "..") per response"""
+        session_ids, events = {}, {}
+        sessions, cells = [], []
+        for stream in streams:
+            for line in stream:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError(f"expected an object, got {line[:40]!r}")
+                names = record.get('events', [])
+                if isinstance(names, str):
+                    names = [names]
+                if 'event' in record:
+                    names = list(names) + [record['event']]
+                row = len(sessions)
+                sessions.append(session_ids.setdefault(str(record.get('session', '')), len(session_ids)))
+                cells.extend((row, events.setdefault(slug(name), len(events))) for name in names)
+        counts = np.zeros((len(sessions), len(events)), dtype=np.int32)
+        if cells:
+            rows, columns = np.array(cells).T
+            np.add.at(counts, (rows, columns), 1)
+        return cls(np.array(sessions, dtype=np.int64), counts, events, session_ids)
+
+    @classmethod
+    def simulate(cls, sessions, responses, seed=0):
+        """Synthetic sessions drawn from SIMULATED_QUALITY and SIMULATED_ACTIONS"""
+        rng = np.random.default_rng(seed)
+        total = sessions * responses
+        events = list(SIMULATED_QUALITY) + list(SIMULATED_ACTIONS)
+        counts = np.zeros((total, len(events)), dtype=np.int32)
+        grades = rng.choice(len(SIMULATED_QUALITY), size=total, p=list(SIMULATED_QUALITY.values()))
+        counts[np.arange(total), grades] = 1
+        rates = np.array(list(SIMULATED_ACTIONS.values()))
+        counts[:, len(SIMULATED_QUALITY):] = rng.random((total, len(rates))) < rates
+        return cls(np.repeat(np.arange(sessions), responses), counts, events,
+                   [f"sim-{i}" for i in range(sessions)])
+
+def trajectories(log, tables):
+    """Trust after every response under every table: responses x tables
+
+    Each response's change is its event counts times the table's modifiers,
+    plus COMPOUND for every perfect response (session_tracking's "+0.5% per
+    perfect response"). One matrix product gives every change; trust then
+    runs from each session's base, clamped to TRUST_MIN..TRUST_MAX after
+    every response, stepping all sessions and tables together one
+    response position at a time.
+    """
+    weights = np.array([[table.modifiers.get(event, 0.0) for table in tables]
+                        for event in log.events]).reshape(len(log.events), len(tables))
+    deltas = log.counts @ weights
+    if PERFECT in log.events and len(log):
+        perfect = log.counts[:, log.events.index(PERFECT)] > 0
+        deltas += np.outer(perfect, [table.modifiers.get(COMPOUND, 0.0) for table in tables])
+    trust = np.empty_like(deltas)
+    current = np.tile([table.base for table in tables], (len(log.starts), 1)).astype(float)
+    for position in range(int(log.lengths.max()) if len(log) else 0):
+        active = log.lengths > position
+        rows = log.starts[active] + position
+        current[active] = np.clip(current[active] + deltas[rows], TRUST_MIN, TRUST_MAX)
+        trust[rows] = current[active]
+    return trust
+
+class Backtest:
+    """Per-session outcomes of each table, as arrays (sessions x tables)"""
+
+    def __init__(self, log, tables, trust):
+        self.tables = list(tables)
+        self.trust = trust
+        ends = log.starts + log.lengths - 1
+        self.final = trust[ends]
+        self.lowest = np.minimum.reduceat(trust, log.starts, axis=0) if len(log) else self.final
+        self.highest = np.maximum.reduceat(trust, log.starts, axis=0) if len(log) else self.final
+
+    def aggregate(self):
+        """Per-table figures as plain numbers"""
+        summary = {}
+        for i, table in enumerate(self.tables):
+            final = self.final[:, i]
+            if not len(final):
+                summary[table.name] = {'sessions': 0}
+                continue
+            p5, median, p95 = np.percentile(final, [5, 50, 95])
+            summary[table.name] = {
+                'base': table.base,
+                'sessions': len(final),
+                'mean_final': float(final.mean()),
+                'median_final': float(median),
+                'p5_final': float(p5),
+                'p95_final': float(p95),
+                'ended_below_base': float((final < table.base).mean() * 100),
+                'hit_floor': float((self.lowest[:, i] <= TRUST_MIN).mean() * 100),
+                'hit_ceiling': float((self.highest[:, i] >= TRUST_MAX).mean() * 100),
+            }
+        return summary
+
+    def save(self, path):
+        np.savez_compressed(path, tables=np.array([t.name for t in self.tables]),
+                            final=self.final, lowest=self.lowest, highest=self.highest)
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Backtest trust modifier tables over response outcomes")
+    parser.add_argument('logs', nargs='*',
+                        help='JSON Lines event logs, {"session": .., "events": [..]} per response '
+                             '(default: stdin)')
+    parser.add_argument('--safety-core', default=str(SAFETY_CORE_PATH),
+                        help="document holding the methodology (default: %(default)s)")
+    parser.add_argument('--bounds', default=','.join(BOUNDS),
+                        help="ends of the documented ranges to compare (default: %(default)s)")
+    parser.add_argument('--table', action='append', default=[], metavar='JSON',
+                        help='alternative table: {"name", "base", "modifiers": {event: delta}} '
+                             'over the low-bound document table (repeatable)')
+    parser.add_argument('--simulate', type=int, metavar='SESSIONS',
+                        help="backtest synthetic sessions instead of logs")
+    parser.add_argument('--responses', type=int, default=50,
+                        help="responses per simulated session (default: %(default)s)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed for --simulate")
+    parser.add_argument('-o', '--output', metavar='NPZ',
+                        help="save per-session final/lowest/highest trust with numpy.savez_compressed")
+    parser.add_argument('--json', action='store_true', help="print the aggregate as JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if np is None:
+        print("❌ numpy is required: pip install numpy")
+        return 1
+    try:
+        bounds = [bound.strip() for bound in args.bounds.split(',') if bound.strip()]
+        unknown = sorted(set(bounds) - set(BOUNDS))
+        if unknown:
+            raise ValueError(f"Unknown bounds: {', '.join(unknown)} (choose from {', '.join(BOUNDS)})")
+        tables = [load_table(args.safety_core, bound) for bound in bounds]
+        document = tables[0] if bounds[:1] == ['low'] else load_table(args.safety_core)
+        tables += [override(document, path) for path in args.table]
+    except (OSError, ET.ParseError, ValueError) as e:
+        print(f"❌ Cannot load modifier tables: {e}")
+        return 1
+    if not tables:
+        print("❌ No modifier tables to backtest")
+        return 1
+
+    start = time.perf_counter()
+    if args.simulate:
+        log = EventLog.simulate(args.simulate, args.responses, args.seed)
+    else:
+        streams = [open(path, encoding='utf-8') for path in args.logs] or [sys.stdin]
+        try:
+            log = EventLog.read(streams)
+        except ValueError as e:
+            print(f"❌ Bad event log line: {e}")
+            return 1
+        finally:
+            for stream in streams:
+                if stream is not sys.stdin:
+                    stream.close()
+    loaded = time.perf_counter()
+    backtest = Backtest(log, tables, trajectories(log, tables))
+    seconds = time.perf_counter() - loaded
+    if args.output:
+        backtest.save(args.output)
+    summary = backtest.aggregate()
+    known = set().union(*(table.modifiers for table in tables))
+    unmodelled = [event for event in log.events if event not in known]
+
+    if args.json:
+        json.dump({'responses': len(log), 'sessions': len(log.starts), 'load_seconds': loaded - start,
+                   'seconds': seconds, 'unmodelled_events': unmodelled, 'tables': summary},
+                  sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print("=" * 60)
+    print("📉 XEREX TRUST ENGINE BACKTEST")
+    print("=" * 60)
+    print(f"{len(log.starts):,} sessions, {len(log):,} responses, {len(tables)} tables: "
+          f"loaded in {(loaded - start) * 1000:.1f} ms, replayed in {seconds * 1000:.1f} ms")
+    if unmodelled:
+        print(f"⚠️ Events no table has a modifier for: {', '.join(unmodelled)}")
+    for table in tables:
+        figures = summary[table.name]
+        print(f"\n  {table.name} (base {percent(table.base)})")
+        if not figures['sessions']:
+            continue
+        print(f"    final trust: mean {percent(figures['mean_final'])}, "
+              f"median {percent(figures['median_final'])}, "
+              f"5-95% {percent(figures['p5_final'])} to {percent(figures['p95_final'])}")
+        print(f"    ended below base: {figures['ended_below_base']:.1f}% | "
+              f"hit {percent(TRUST_MIN)}: {figures['hit_floor']:.1f}% | "
+              f"hit {percent(TRUST_MAX)}: {figures['hit_ceiling']:.1f}% of sessions")
+    if len(tables) > 1 and len(log):
+        print("\nModifiers that differ:")
+        for event in sorted(known):
+            values = [table.modifiers.get(event, 0.0) for table in tables]
+            if len(set(values)) > 1:
+                print(f"  {event:<26} " + "  ".join(f"{signed(v):>7}" for v in values))
+    if args.output:
+        print(f"\nPer-session arrays saved to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,122 +1,668 @@
 #!/usr/bin/env python3
 """
 validate_xerex.py - XEREX Robot Inspector v19.7.9
-Fixed version that actually works
+Streams each document once and evaluates every registered check in that pass
 """
 
 import xml.etree.ElementTree as ET
+import xml.parsers.expat as expat
+import argparse
+import hashlib
+import json
+import os
+import subprocess
 import sys
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
-def validate_behavioral_rules(root):
+from context_header import parse_context_header, with_dependents
+from token_budget import CONTEXT_WINDOW_TOKENS, check_budget, estimate_tokens, write_budget
+from xerex_io import AtomicFile
+from xerex_profile import NULL_PROFILER, Profiler
+from xerex_report import FORMATS, ReportWriter, file_findings, finding, location
+
+EXPECTED_VERSION = "19.7.9"
+CHUNK_SIZE = 64 * 1024
+# Imported modules whose code decides check results, hashed into the cache key
+CHECK_MODULES = ('context_header', 'token_budget', 'xerex_report')
+CACHE_PATH = Path('.xerex_cache.json')
+CACHE_MAX_ENTRIES = 2048
+
+# Bytes that continue a UTF-8 sequence; deleting them leaves one byte per character
+CONTINUATION_BYTES = bytes(range(0x80, 0xC0))
+
+Check = namedtuple('Check', 'id paths func missing deferred', defaults=(False,))
+
+# Registered checks, in report order
+CHECKS = []
+
+def check(check_id, *paths, missing=None, deferred=False):
+    """Register a check on the first element matching one of paths
+
+    Paths are relative to the document root: 'a/b' is anchored at the root,
+    './/a/b' matches anywhere below it, and earlier paths win over later
+    ones. The check runs once the matched subtree is complete; if no path
+    matches it is skipped and `missing` (valid, message) is reported.
+
+    Deferred checks run when the document ends instead, as func(elem, stats)
+    with the matched element (or None) and the DocumentStats of the pass.
+    """
+    def register(func):
+        CHECKS.append(Check(check_id, paths, func, missing, deferred))
+        return func
+    return register
+
+def compile_plan(checks):
+    """Compile every declared path into one lookup table for the stream
+
+    Returns {tag: [(check index, rank, steps, anchored), ...]} keyed by the
+    last step, so elements no check asked for cost a single dict miss.
+    """
+    plan = {}
+    for index, spec in enumerate(checks):
+        for rank, path in enumerate(spec.paths):
+            anchored = not path.startswith('.//')
+            steps = tuple((path if anchored else path[3:]).split('/'))
+            if not all(step and step not in ('.', '..', '*') for step in steps):
+                raise ValueError(f"Unsupported path {path!r} in check {spec.id}")
+            plan.setdefault(steps[-1], []).append((index, rank, steps, anchored))
+    return plan
+
+@check('behavioral_rules', './/behavioral_rules',
+       missing=(False, "❌ No behavioral_rules found"))
+def validate_behavioral_rules(rules):
     """Check if behavioral rules exist and are self-referential"""
-    rules = root.find('.//behavioral_rules')
-    if not rules:
-        return False, "❌ No behavioral_rules found"
-    
     rule_count = len(rules)
+    if rule_count == 0:
+        return False, "❌ No behavioral_rules found"
     if rule_count < 8:
         return False, f"❌ Only {rule_count} rules (need 8+)"
-    
+
     # Check for self-referential rules
     has_self_ref = False
     has_self_check = False
-    
+
     for rule in rules:
         if rule.text and 'self-referential' in rule.text:
             has_self_ref = True
         if rule.text and 'self-check' in rule.text:
             has_self_check = True
-    
+
     if not (has_self_ref and has_self_check):
         return False, "❌ Missing self-referential rules"
-    
+
     return True, f"✓ {rule_count} behavioral rules with self-reference"
 
-def validate_character_count(root):
+@check('character_count', './/character_count',
+       missing=(True, "⚠️ No character count metadata"))
+def validate_character_count(metadata):
     """Check character optimization"""
-    metadata = root.find('.//character_count')
-    if not metadata:
+    if len(metadata) == 0:
         return True, "⚠️ No character count metadata"
-    
-    current = metadata.find('current')
+
     limit = metadata.find('limit')
     target = metadata.find('target')
-    
-    if limit and target:
-        limit_val = int(limit.text)
-        target_val = int(target.text)
+
+    if limit is not None and target is not None:
+        try:
+            limit_val = int(limit.text)
+            target_val = int(target.text)
+        except (TypeError, ValueError):
+            return False, f"❌ Unreadable character count ({target.text}/{limit.text})"
         if target_val > limit_val * 0.8:
             return False, f"❌ Target too high ({target_val}/{limit_val})"
-    
+
     return True, "✓ Character count optimized"
 
-def validate_xml_structure(filepath):
-    """Main validation function"""
-    try:
-        tree = ET.parse(filepath)
-        root = tree.getroot()
-        
+@check('version', 'current_version', './/current_version',
+       missing=(False, "❌ No version found"))
+def validate_version(version):
+    """Check the document is at the expected version"""
+    v_text = version.text.strip() if version.text else ""
+    if v_text == EXPECTED_VERSION:
+        return True, f"✓ Version {EXPECTED_VERSION} confirmed"
+    return False, f"❌ Wrong version (found: '{v_text}')"
+
+@check('budget', './/character_count/limit', deferred=True)
+def validate_budget(limit, stats):
+    """Check measured size against the declared limit and the context window"""
+    limit_val = None
+    if limit is not None and limit.text and limit.text.strip().isdigit():
+        limit_val = int(limit.text)
+    stats.limit = limit_val
+    return check_budget(stats.chars, limit_val, stats.header, stats.window)
+
+class DocumentStats:
+    """Sizes measured during the streaming pass"""
+
+    def __init__(self):
+        self.bytes = 0
+        self.chars = 0
+        self.limit = None
+        self.header = None
+        # context window in tokens the budget check holds the document to
+        self.window = CONTEXT_WINDOW_TOKENS
+        self.seconds = 0.0
+        # top-level section tag -> characters, in document order
+        self.sections = {}
+        # one structured record per check, filled in by close()
+        self.findings = []
+
+    @property
+    def tokens(self):
+        return estimate_tokens(self.chars)
+
+    def summary(self):
+        """Plain-dict form for the cache and reports"""
+        return {
+            'bytes': self.bytes,
+            'chars': self.chars,
+            'tokens': self.tokens,
+            'limit': self.limit,
+            'seconds': self.seconds,
+            'sections': self.sections,
+            'findings': self.findings,
+        }
+
+class StreamInspector:
+    """Single-pass inspection of one document fed in chunks
+
+    expat drives a TreeBuilder directly so byte offsets are available for
+    size accounting. Only the subtrees a check is waiting on are kept;
+    everything else is detached from its parent as soon as it closes, so
+    memory stays flat however large the document is. window overrides
+    the context window the budget check applies (None: no window).
+    """
+
+    def __init__(self, checks=None, window=CONTEXT_WINDOW_TOKENS):
+        self.checks = CHECKS if checks is None else checks
+        self.plan = compile_plan(self.checks)
+        self.stats = DocumentStats()
+        self.stats.window = window
+        self.builder = ET.TreeBuilder()
+        self.parser = expat.ParserCreate()
+        self.parser.buffer_text = True
+        self.parser.StartElementHandler = self._start
+        self.parser.EndElementHandler = self._end
+        self.parser.CharacterDataHandler = self.builder.data
+        self.parser.CommentHandler = self._comment
+        self.stack = []
+        self.tags = []
+        # check index -> (rank, element) while open, (rank, result) once done;
+        # deferred checks keep (rank, element) in done until close()
+        self.open = {}
+        self.done = {}
+        self.held = set()
+        # check index -> element path and (line, column) of its match, and
+        # time spent in its function
+        self.paths = {}
+        self.positions = {}
+        self.check_seconds = {}
+        # (first byte, data) of every fed chunk the (byte, char) cursor has
+        # not passed yet; events only move forward, so passed ones are dropped
+        self.chunks = deque()
+        self.cursor = (0, 0)
+        # byte offset of the latest start tag; no later event comes before it
+        self.last_event = 0
+        self.section = None
+
+    def feed(self, data):
+        """Parse the next chunk and run any checks it completes"""
+        start = time.perf_counter()
+        stats = self.stats
+        if self.last_event > self.cursor[0]:
+            # Catch up to the parser so chunks between sections are not kept
+            self._char_offset(self.last_event)
+        self.chunks.append((stats.bytes, data))
+        stats.bytes += len(data)
+        stats.chars += len(data.translate(None, CONTINUATION_BYTES))
+        self._parse(data, False)
+        stats.seconds += time.perf_counter() - start
+
+    def close(self):
+        """Finish the document and return (all_valid, results)
+
+        The same outcomes are kept as structured records in stats.findings.
+        """
+        start = time.perf_counter()
+        self._parse(b'', True)
+
         results = []
         all_valid = True
-        
-        # Check behavioral rules
-        valid, msg = validate_behavioral_rules(root)
-        results.append(msg)
-        all_valid = all_valid and valid
-        
-        # Check character optimization  
-        valid, msg = validate_character_count(root)
-        results.append(msg)
-        all_valid = all_valid and valid
-        
-        # Check version - look in root level or anywhere
-        version = root.find('current_version')
-        if not version:
-            version = root.find('.//current_version')
-        
-        if version is not None:
-            v_text = version.text.strip() if version.text else ""
-            if v_text == "19.7.9":
-                results.append("✓ Version 19.7.9 confirmed")
+        for index, spec in enumerate(self.checks):
+            found = self.done.get(index)
+            if spec.deferred:
+                valid, msg = self._run(index, found[1] if found else None, self.stats)
             else:
-                results.append(f"❌ Wrong version (found: '{v_text}')")
-                all_valid = False
-        else:
-            results.append("❌ No version found")
-            all_valid = False
-        
+                valid, msg = found[1] if found else spec.missing
+            results.append(msg)
+            all_valid = all_valid and valid
+            self.stats.findings.append(finding(spec.id, valid, msg, self.paths.get(index),
+                                               *self.positions.get(index, (None, None)),
+                                               seconds=self.check_seconds.get(index, 0.0)))
+        self.stats.seconds += time.perf_counter() - start
         return all_valid, results
-        
+
+    def _run(self, index, *args):
+        """Call one check function, charging its time to that check"""
+        start = time.perf_counter()
+        try:
+            return self.checks[index].func(*args)
+        finally:
+            self.check_seconds[index] = self.check_seconds.get(index, 0.0) + time.perf_counter() - start
+
+    def _parse(self, data, final):
+        try:
+            self.parser.Parse(data, final)
+        except expat.ExpatError as e:
+            err = ET.ParseError(str(e))
+            err.code = e.code
+            err.position = (e.lineno, e.offset)
+            raise err from None
+
+    def _char_offset(self, byte_offset):
+        """Character offset of a byte offset, counted on from the last one asked for
+
+        The cursor keeps a running total, so the answer does not depend on
+        how the document was split into chunks, however long a token is.
+        """
+        cursor_byte, cursor_char = self.cursor
+        if byte_offset < cursor_byte:
+            raise ValueError(f"Byte offset {byte_offset} is behind the cursor at {cursor_byte}")
+        while cursor_byte < byte_offset:
+            first_byte, data = self.chunks[0]
+            chunk_end = first_byte + len(data)
+            end = min(byte_offset, chunk_end)
+            piece = data[cursor_byte - first_byte:end - first_byte]
+            cursor_char += len(piece.translate(None, CONTINUATION_BYTES))
+            cursor_byte = end
+            if end == chunk_end:
+                self.chunks.popleft()
+        self.cursor = (cursor_byte, cursor_char)
+        return cursor_char
+
+    def _boundary(self, label):
+        """Close the running top-level section and start the next one"""
+        offset = self._char_offset(self.parser.CurrentByteIndex)
+        if self.section is not None:
+            name, start = self.section
+            sections = self.stats.sections
+            sections[name] = sections.get(name, 0) + offset - start
+        self.section = (label, offset) if label is not None else None
+
+    def _match(self, elem):
+        """Claim elem for every check whose best path so far it improves on"""
+        for index, rank, steps, anchored in self.plan.get(elem.tag, ()):
+            if index in self.open:
+                continue
+            best = self.done.get(index)
+            if best is not None and best[0] <= rank:
+                continue
+            depth = len(self.tags)
+            if anchored and depth != len(steps):
+                continue
+            if depth < len(steps) or tuple(self.tags[depth - len(steps):]) != steps:
+                continue
+            self.open[index] = (rank, elem)
+            self.paths[index] = '/'.join([self.stack[0].tag] + self.tags)
+            # expat is positioned at this start tag; its columns count from 0
+            self.positions[index] = (self.parser.CurrentLineNumber,
+                                     self.parser.CurrentColumnNumber + 1)
+            self.held.add(id(elem))
+
+    def _comment(self, data):
+        if len(self.stack) == 1:
+            self._boundary('<!-- -->')
+        if self.stats.header is None:
+            self.stats.header = parse_context_header(data)
+
+    def _start(self, tag, attrs):
+        self.last_event = self.parser.CurrentByteIndex
+        if len(self.stack) == 1:
+            self._boundary(tag)
+        elem = self.builder.start(tag, attrs)
+        if self.stack:
+            self.tags.append(tag)
+            self._match(elem)
+        self.stack.append(elem)
+
+    def _end(self, tag):
+        elem = self.builder.end(tag)
+        self.stack.pop()
+        if self.tags:
+            self.tags.pop()
+        else:
+            self._boundary(None)
+
+        if id(elem) in self.held:
+            self.held.discard(id(elem))
+            for index, (rank, match) in list(self.open.items()):
+                if match is elem:
+                    del self.open[index]
+                    spec = self.checks[index]
+                    self.done[index] = (rank, elem if spec.deferred else self._run(index, elem))
+
+        # Detach finished elements unless an open match still needs them
+        if not self.held and self.stack:
+            self.stack[-1].remove(elem)
+
+def inspect_chunks(chunks, profiler=None):
+    """Validate a document given as byte chunks; returns (valid, results, stats summary or None)
+
+    With a Profiler, parsing and every check are timed into it.
+    """
+    profiler = profiler or NULL_PROFILER
+    try:
+        inspector = StreamInspector(profiler.wrap(CHECKS))
+        for chunk in chunks:
+            with profiler.span('parse', 'parse'):
+                inspector.feed(chunk)
+        with profiler.span('parse', 'parse'):
+            valid, results = inspector.close()
+        return valid, results, inspector.stats.summary()
+
     except ET.ParseError as e:
-        return False, [f"❌ XML Parse Error: {e}"]
+        return False, [f"❌ XML Parse Error: {e}"], None
+
+def inspect_file(filepath, profiler=None):
+    """Validate one file; returns (valid, results, stats summary or None)"""
+    profiler = profiler or NULL_PROFILER
+    with open(filepath, 'rb') as f, profiler.file(filepath):
+        return inspect_chunks(profiler.reads(f, CHUNK_SIZE, filepath), profiler)
+
+def inspect_data(data, profiler=None):
+    """Validate a document already in memory"""
+    return inspect_chunks((data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE)),
+                          profiler)
+
+def profile_file(filepath):
+    """inspect_file() under a fresh Profiler; its export() rides along for merging"""
+    profiler = Profiler()
+    return inspect_file(filepath, profiler) + (profiler.export(),)
+
+def validate_xml_structure(filepath):
+    """Main validation function"""
+    valid, results, _ = inspect_file(filepath)
+    return valid, results
+
+def content_hash(filepath):
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def validator_version():
+    """Fingerprint of this inspector and the modules its checks call into
+
+    Any edit to one of them (a budget constant, the header parser, the
+    finding records) invalidates old results.
+    """
+    digest = hashlib.sha256()
+    for path in [__file__] + [sys.modules[name].__file__ for name in CHECK_MODULES]:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
 
-def main():
+class ResultCache:
+    """Persistent LRU of validation results
+
+    Keys are validator version + content hash, so an unchanged file replays
+    its result lines without being parsed. The JSON object keeps insertion
+    order, which doubles as recency order: hits move to the end and the
+    oldest entries are evicted once the cap is reached.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=CACHE_MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.version = validator_version()
+        self.dirty = False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+        if not isinstance(self.entries, dict):
+            self.entries = {}
+
+    def key(self, digest):
+        return f"{self.version}:{digest}"
+
+    def get(self, digest):
+        """Return cached (valid, results, stats) or None"""
+        entry = self.entries.pop(self.key(digest), None)
+        if entry is None:
+            return None
+        self.entries[self.key(digest)] = entry
+        self.dirty = True
+        return entry['valid'], entry['results'], entry.get('stats')
+
+    def put(self, digest, valid, results, stats=None):
+        self.entries.pop(self.key(digest), None)
+        self.entries[self.key(digest)] = {'valid': valid, 'results': results, 'stats': stats}
+        while len(self.entries) > self.max_entries:
+            del self.entries[next(iter(self.entries))]
+        self.dirty = True
+
+    def save(self):
+        """Write the cache atomically if anything changed"""
+        if not self.dirty:
+            return
+        try:
+            with AtomicFile(self.path, 'w', prefix=self.path.name, encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+        except OSError:
+            return
+        self.dirty = False
+
+def validate_files(files, jobs=1, cache=None, profiler=None):
+    """Yield (filepath, valid, results, stats) for each file, in the order given
+
+    Files whose content hash is already in the cache are replayed without
+    parsing. With jobs > 1 the rest are spread across worker processes;
+    results are still yielded in input order so the report is deterministic.
+    With a profiler, each parsed file is profiled (in its worker) and merged.
+    """
+    digests = [content_hash(f) for f in files] if cache is not None else [None] * len(files)
+    hits = [cache.get(d) if cache is not None else None for d in digests]
+    misses = [f for f, hit in zip(files, hits) if hit is None]
+
+    worker = inspect_file if profiler is None else profile_file
+    pool = None
+    if jobs > 1 and len(misses) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(misses)))
+        fresh = pool.map(worker, misses)
+    else:
+        fresh = map(worker, misses)
+
+    try:
+        for filepath, digest, hit in zip(files, digests, hits):
+            if hit is not None:
+                valid, results, stats = hit
+            else:
+                valid, results, stats, *profile = next(fresh)
+                if profile:
+                    profiler.merge(profile[0])
+                if cache is not None:
+                    cache.put(digest, valid, results, stats)
+            yield filepath, valid, results, stats
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def git_lines(*args):
+    """Run a git command and return its output lines"""
+    out = subprocess.run(('git',) + args, capture_output=True, text=True, check=True).stdout
+    return [line for line in out.splitlines() if line]
+
+def changed_since(rev, files=None):
+    """XML files changed since rev (committed, staged, unstaged or new),
+    plus every document whose CONTEXT HEADER says it depends on one of them
+
+    With explicit files, only those are considered; otherwise every XML
+    file git knows about or would pick up.
+    """
+    changed = git_lines('diff', '--name-only', '--relative', '--diff-filter=d', rev, '--', '*.xml')
+    changed += git_lines('ls-files', '--others', '--exclude-standard', '--', '*.xml')
+    if files:
+        wanted = {os.path.normpath(f) for f in files}
+        changed = [f for f in changed if os.path.normpath(f) in wanted]
+    universe = tracked_xml(files)
+    return with_dependents(changed, universe) if changed else []
+
+def tracked_xml(files=None):
+    """files, or every XML file git knows about or would pick up; only those that exist"""
+    if not files:
+        files = git_lines('ls-files', '--cached', '--others', '--exclude-standard', '--', '*.xml')
+    return [f for f in files if os.path.exists(f)]
+
+def print_budget(stats, log=print):
+    """Per-section size breakdown for one document"""
+    for section, chars in stats['sections'].items():
+        log(f"    {section:<28} {chars:>10,} chars  ~{estimate_tokens(chars):>8,} tokens")
+
+def open_report(args):
+    """ReportWriter for --format, writing to --output or stdout"""
+    stream = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    return ReportWriter(args.format, stream, CHECKS)
+
+def close_report(writer, args):
+    writer.close()
+    if args.output:
+        writer.stream.close()
+
+def parse_args(argv):
+    """Command line: files to check plus inspector options"""
+    parser = argparse.ArgumentParser(description="XEREX Robot Inspector")
+    parser.add_argument('files', nargs='*', help="XML files (default: *.xml)")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="worker processes (0 = one per CPU)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore cached results and revalidate every file")
+    parser.add_argument('--changed-since', metavar='REV',
+                        help="only files changed since git REV, plus their dependents")
+    parser.add_argument('--watch', action='store_true',
+                        help="keep running and re-validate files as they change")
+    parser.add_argument('--budget', action='store_true',
+                        help="report per-section character/token usage")
+    parser.add_argument('--write-budget', action='store_true',
+                        help="write measured <current> and <usage> back to each file")
+    parser.add_argument('--profile', action='store_true',
+                        help="time reads, parsing and each check; print a ranked table (implies --no-cache)")
+    parser.add_argument('--profile-trace', metavar='PATH',
+                        help="write the profile as Chrome trace-event JSON (implies --no-cache)")
+    parser.add_argument('--format', choices=FORMATS, default='text',
+                        help="text report, JSON Lines streamed per file, or SARIF (default: %(default)s)")
+    parser.add_argument('-o', '--output', metavar='PATH',
+                        help="write the jsonl/sarif report here instead of stdout")
+    args = parser.parse_args(argv)
+    if args.output and args.format == 'text':
+        parser.error("-o/--output needs --format jsonl or sarif; the text report goes to stdout")
+    if args.watch and args.format != 'text':
+        parser.error("--watch prints a text report; it cannot be combined with --format")
+    return args
+
+def main(argv=None):
     """Validate all XEREX documents"""
-    print("=" * 50)
-    print("🤖 XEREX ROBOT INSPECTOR v19.7.9")
-    print("=" * 50)
-    
-    files = sys.argv[1:] if len(sys.argv) > 1 else list(Path('.').glob('*.xml'))
-    
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    jobs = args.jobs or os.cpu_count() or 1
+    # Machine formats own stdout; the human report moves to stderr
+    reporting = args.format != 'text'
+    log = partial(print, file=sys.stderr) if reporting else print
+
+    log("=" * 50)
+    log("🤖 XEREX ROBOT INSPECTOR v19.7.9")
+    log("=" * 50)
+
+    if args.changed_since:
+        try:
+            files = changed_since(args.changed_since, args.files)
+        except (OSError, subprocess.CalledProcessError) as e:
+            # e.g. no commits yet: nothing to compare with, so check everything
+            log(f"⚠️ Cannot ask git for changes since {args.changed_since}: "
+                f"{(getattr(e, 'stderr', '') or str(e)).strip()}")
+            try:
+                files = tracked_xml(args.files)
+            except (OSError, subprocess.CalledProcessError):
+                files = [f for f in args.files if os.path.exists(f)]
+            log(f"Validating all {len(files)} XML file(s) instead")
+        else:
+            if not files:
+                log(f"No XML changes since {args.changed_since}")
+                if reporting:
+                    # Nothing checked is still a clean report, not an empty file
+                    close_report(open_report(args), args)
+                return 0
+            log(f"Changed since {args.changed_since}: {len(files)} file(s) incl. dependents")
+    else:
+        files = args.files or [str(p) for p in Path('.').glob('*.xml')]
+
     if not files:
-        print("No files to validate!")
+        log("No files to validate!")
         return 1
-    
+
+    if args.watch:
+        from watch_xerex import watch
+        return watch(files)
+
+    # A profile only means something if every file is really parsed
+    profiling = args.profile or args.profile_trace
+    profiler = Profiler() if profiling else None
+    cache = None if args.no_cache or profiling else ResultCache()
+    # Opened only now, so an early return never leaves a truncated --output
+    writer = open_report(args) if reporting else None
+
     all_valid = True
-    for filepath in files:
-        print(f"\nChecking: {filepath}")
-        valid, results = validate_xml_structure(filepath)
-        for result in results:
-            print(f"  {result}")
+    total_tokens = 0
+    for filepath, valid, results, stats in validate_files(files, jobs, cache, profiler):
+        if writer is not None:
+            writer.file(filepath, valid, results, stats)
+        log(f"\nChecking: {filepath}")
+        for result, record in zip(results, file_findings(results, stats)):
+            log(f"  {result}{location(filepath, record)}")
         all_valid = all_valid and valid
-    
-    print("\n" + "=" * 50)
+
+        if stats is None:
+            continue
+        total_tokens += stats['tokens']
+        if args.budget:
+            print_budget(stats, log)
+        if args.write_budget:
+            written = write_budget(filepath, stats['chars'])
+            if written is not None:
+                log(f"  ✍️ Recorded {written:,} chars in <character_count>")
+
+    if cache is not None:
+        cache.save()
+
+    if args.profile:
+        log("\n⏱️  Profile (ranked by self time):")
+        log(profiler.table())
+    if args.profile_trace:
+        profiler.write_trace(args.profile_trace)
+        log(f"\n⏱️  Trace written to {args.profile_trace}")
+
+    if args.budget:
+        share = total_tokens * 100 / CONTEXT_WINDOW_TOKENS
+        log(f"\nAll documents: ~{total_tokens:,} tokens ({share:.1f}% of {CONTEXT_WINDOW_TOKENS:,}-token context)")
+        if total_tokens > CONTEXT_WINDOW_TOKENS:
+            log("  ❌ Documents together exceed the context window")
+            all_valid = False
+
+    if writer is not None:
+        close_report(writer, args)
+
+    log("\n" + "=" * 50)
     if all_valid:
-        print("✅ ALL CHECKS PASSED - Ready for upload!")
+        log("✅ ALL CHECKS PASSED - Ready for upload!")
         return 0
     else:
-        print("❌ PROBLEMS FOUND - Fix before uploading")
+        log("❌ PROBLEMS FOUND - Fix before uploading")
         return 1
 
 if __name__ == "__main__":
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+verification_score.py - Batch testVerificationLanguage() over logged responses
+Compiles the testing suite's verification phrases once, streams JSONL
+transcripts through worker processes, and keeps per-response and aggregate
+scores as NumPy arrays
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from validate_xerex import EXPECTED_VERSION
+from xerex_logs import batches, map_bounded, response_text
+
+SUITE_PATH = Path('project_knowledge') / f"testing_suite_v{EXPECTED_VERSION}.xml"
+# The suite's status line: percentage >= 95 is a PASS
+PASS_PERCENTAGE = 95
+PHRASES_RE = re.compile(r'verificationPhrases\s*=\s*\[(.*?)\]', re.S)
+STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+REGEX_CHARS = set('.^$*+?{}[]\\|()')
+
+def load_phrases(path=SUITE_PATH):
+    """The verificationPhrases array from testVerificationLanguage() in the suite"""
+    root = ET.parse(path).getroot()
+    for content in root.iter('document_content'):
+        m = PHRASES_RE.search(content.text or '')
+        if m:
+            return [json.loads(f'"{s}"') for s in STRING_RE.findall(m.group(1))]
+    raise ValueError(f"No verificationPhrases array in {path}")
+
+class PhraseSet:
+    """The phrase list compiled once; counts(text) gives one count per phrase
+
+    Matches the suite's new RegExp(phrase, 'g'): case-sensitive, counting
+    non-overlapping occurrences of each phrase on its own. Plain phrases
+    (all of the suite's) are counted with str.count, which gives the same
+    answer without the regex engine; anything else is compiled as a regex.
+    """
+
+    def __init__(self, phrases):
+        self.phrases = list(phrases)
+        if not self.phrases:
+            raise ValueError("No verification phrases")
+        self.matchers = [None if REGEX_CHARS.isdisjoint(phrase) else re.compile(phrase)
+                         for phrase in self.phrases]
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def counts(self, text):
+        return [text.count(phrase) if matcher is None else len(matcher.findall(text))
+                for phrase, matcher in zip(self.phrases, self.matchers)]
+
+# Worker processes build the phrase set once
+_phrases = None
+
+def _init_worker(phrases):
+    global _phrases
+    _phrases = PhraseSet(phrases)
+
+def _count_batch(lines):
+    """(responses x phrases count matrix, characters) for one batch of log lines"""
+    rows = []
+    chars = 0
+    for line in lines:
+        chars += len(line)
+        line = line.strip()
+        if line:
+            rows.append(_phrases.counts(response_text(line)))
+    matrix = np.array(rows, dtype=np.int32).reshape(len(rows), len(_phrases))
+    return matrix, chars
+
+class Scores:
+    """Per-response scores as arrays, in log order
+
+    counts is responses x phrases; count, percentage, passed and improvement
+    are the suite's fields for every response at once. improvement is the
+    change from the previous response (0 for the first).
+    """
+
+    def __init__(self, phrases, counts):
+        self.phrases = list(phrases)
+        self.counts = counts
+        self.count = counts.sum(axis=1)
+        self.percentage = np.minimum(self.count * 100.0 / len(self.phrases), 100.0)
+        self.passed = self.percentage >= PASS_PERCENTAGE
+        self.improvement = np.diff(self.percentage, prepend=self.percentage[:1])
+
+    def __len__(self):
+        return len(self.count)
+
+    def aggregate(self):
+        """Corpus-wide figures as plain numbers"""
+        n = len(self)
+        if not n:
+            return {'responses': 0}
+        return {
+            'responses': n,
+            'mean_percentage': float(self.percentage.mean()),
+            'median_percentage': float(np.median(self.percentage)),
+            'pass_rate': float(self.passed.mean() * 100),
+            'phrases': {phrase: {'total': int(total), 'responses': int(seen)}
+                        for phrase, total, seen in zip(self.phrases, self.counts.sum(axis=0),
+                                                       (self.counts > 0).sum(axis=0))},
+        }
+
+    def save(self, path):
+        np.savez_compressed(path, phrases=np.array(self.phrases), counts=self.counts,
+                            count=self.count, percentage=self.percentage,
+                            passed=self.passed, improvement=self.improvement)
+
+def score(streams, phrases, jobs=1):
+    """Score every response in the streams; returns (Scores, characters, seconds)"""
+    start = time.perf_counter()
+    matrices = []
+    chars = 0
+    for matrix, size in map_bounded(_count_batch, batches(streams), jobs,
+                                    _init_worker, (list(phrases),)):
+        matrices.append(matrix)
+        chars += size
+    counts = (np.concatenate(matrices) if matrices
+              else np.zeros((0, len(phrases)), dtype=np.int32))
+    return Scores(phrases, counts), chars, time.perf_counter() - start
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Score verification language across response logs")
+    parser.add_argument('logs', nargs='*',
+                        help="JSON Lines transcripts (or plain text, one response per line; default: stdin)")
+    parser.add_argument('--suite', default=str(SUITE_PATH),
+                        help="testing suite holding the phrase list (default: %(default)s)")
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help="worker processes (0 = one per CPU)")
+    parser.add_argument('-o', '--output', metavar='NPZ',
+                        help="save the per-response arrays with numpy.savez_compressed")
+    parser.add_argument('--json', action='store_true', help="print the aggregate as JSON")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if np is None:
+        print("❌ numpy is required: pip install numpy")
+        return 1
+    try:
+        phrases = load_phrases(args.suite)
+    except (OSError, ET.ParseError, ValueError) as e:
+        print(f"❌ Cannot load verification phrases from {args.suite}: {e}")
+        return 1
+
+    streams = [open(path, encoding='utf-8', errors='replace') for path in args.logs] or [sys.stdin]
+    try:
+        scores, chars, seconds = score(streams, phrases, args.jobs or os.cpu_count() or 1)
+    finally:
+        for stream in streams:
+            if stream is not sys.stdin:
+                stream.close()
+    if args.output:
+        scores.save(args.output)
+    summary = scores.aggregate()
+
+    if args.json:
+        summary.update(chars=chars, seconds=seconds)
+        json.dump(summary, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        return 0
+
+    print("=" * 60)
+    print(f"📏 XEREX VERIFICATION LANGUAGE SCORER v{EXPECTED_VERSION}")
+    print("=" * 60)
+    rate = chars / 1e6 / seconds if seconds else 0
+    print(f"Scored {len(scores):,} responses ({chars / 1e6:.1f}M chars) in "
+          f"{seconds * 1000:.1f} ms ({rate:.1f}M chars/s)")
+    if not len(scores):
+        return 0
+    print(f"Mean score: {summary['mean_percentage']:.1f}% | Median: {summary['median_percentage']:.1f}% | "
+          f"Passing (>= {PASS_PERCENTAGE}%): {summary['pass_rate']:.1f}%\n")
+    for phrase, totals in summary['phrases'].items():
+        share = totals['responses'] * 100 / len(scores)
+        print(f"  {phrase:<24} {totals['total']:>12,}  (in {share:.1f}% of responses)")
+    if args.output:
+        print(f"\nPer-response arrays saved to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+version_sync.py - pattern_89 (Version Sync Failure) scanner for XEREX documents
+Streams every file once, line by line, and reports each version occurrence with
+file:line; current_version, <version>, latest_version and file names must agree
+"""
+
+import argparse
+import io
+import re
+import sys
+from collections import Counter, namedtuple
+from pathlib import Path
+
+from validate_xerex import EXPECTED_VERSION
+from xerex_index import knowledge_files
+
+Occurrence = namedtuple('Occurrence', 'file line kind version text')
+
+# One scanner for every form a version takes; the first group that matched
+# names the kind. Fields are authoritative, mentions are history or references
+VERSION_RE = re.compile(
+    rb'<(?P<field>current_version|version|latest_version)>\s*(?P<field_v>\d+(?:\.\d+)+)\s*</(?P=field)>'
+    rb'|(?P<attr>[A-Za-z_]+)="v?(?P<attr_v>\d+\.\d+\.\d+)"'
+    rb'|\bv(?P<mention_v>\d+\.\d+\.\d+)\b'
+)
+FILENAME_RE = re.compile(r'_v(\d+(?:\.\d+)+)\.xml$')
+AUTHORITATIVE = ('current_version', 'version', 'latest_version', 'filename')
+
+def scan_file(filepath, data=None):
+    """Yield every version occurrence in one file, in order
+
+    Reads a line at a time, so memory stays bounded by the longest line
+    however many or large the files are. Pass data to scan bytes already
+    in memory instead of reading filepath.
+    """
+    m = FILENAME_RE.search(Path(filepath).name)
+    if m:
+        yield Occurrence(filepath, 0, 'filename', m.group(1), Path(filepath).name)
+    with open(filepath, 'rb') if data is None else io.BytesIO(data) as f:
+        for lineno, line in enumerate(f, 1):
+            for m in VERSION_RE.finditer(line):
+                if m.group('field'):
+                    kind, version = m.group('field').decode(), m.group('field_v')
+                elif m.group('attr'):
+                    kind, version = f"@{m.group('attr').decode()}", m.group('attr_v')
+                else:
+                    kind, version = 'mention', m.group('mention_v')
+                yield Occurrence(filepath, lineno, kind, version.decode(),
+                                 m.group().decode('utf-8', 'replace'))
+
+class VersionReport:
+    """Running totals for a scan; keeps only counts and the mismatches"""
+
+    def __init__(self, expected=EXPECTED_VERSION):
+        self.expected = expected
+        self.files = 0
+        self.errors = []
+        self.fields = Counter()
+        self.mentions = Counter()
+        self.unreadable = []
+
+    def add(self, occ):
+        if occ.kind in AUTHORITATIVE:
+            self.fields[occ.version] += 1
+            if occ.version != self.expected:
+                self.errors.append(occ)
+        else:
+            self.mentions[occ.version] += 1
+
+    @property
+    def consistent(self):
+        return not self.errors and not self.unreadable
+
+    def summary(self):
+        fields = sum(self.fields.values())
+        if self.consistent:
+            return f"All files at version {self.expected} ({fields} version fields in {self.files} files)"
+        found = ', '.join(f"{v} x{n}" for v, n in self.fields.most_common())
+        return (f"pattern_89 Version Sync Failure: {len(self.errors)} of {fields} "
+                f"version fields disagree with {self.expected} (found: {found})")
+
+def scan(files, expected=EXPECTED_VERSION, on_occurrence=None, contents=None):
+    """Scan files in one pass; returns the VersionReport
+
+    contents optionally maps file paths to bytes already read.
+    """
+    contents = contents or {}
+    report = VersionReport(expected)
+    for filepath in files:
+        report.files += 1
+        try:
+            for occ in scan_file(filepath, contents.get(filepath)):
+                report.add(occ)
+                if on_occurrence is not None:
+                    on_occurrence(occ)
+        except OSError as e:
+            report.unreadable.append((filepath, str(e)))
+    return report
+
+def location(occ):
+    return f"{occ.file}:{occ.line}" if occ.line else occ.file
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Check that every XEREX document agrees on its version")
+    parser.add_argument('files', nargs='*',
+                        help="XML files (default: standalone/ and project_knowledge/)")
+    parser.add_argument('--expect', default=EXPECTED_VERSION, metavar='VERSION',
+                        help=f"version every field must carry (default: {EXPECTED_VERSION})")
+    parser.add_argument('-a', '--all', action='store_true',
+                        help="list every occurrence, including history mentions")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    files = args.files or knowledge_files()
+
+    def show(occ):
+        print(f"{location(occ)}: {occ.kind} {occ.version}  {occ.text}")
+
+    report = scan(files, args.expect, show if args.all else None)
+    if not args.all:
+        for occ in report.errors:
+            print(f"{location(occ)}: {occ.kind} {occ.version} (expected {report.expected})  {occ.text}")
+    for filepath, error in report.unreadable:
+        print(f"{filepath}: ERROR - {error}")
+    print(report.summary())
+    return 0 if report.consistent else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
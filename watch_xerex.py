@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+watch_xerex.py - Keeps the Robot Inspector running while documents are edited
+Re-validates only files whose mtime and content hash changed and prints result diffs
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+
+from validate_xerex import content_hash, inspect_file
+
+POLL_INTERVAL = 0.5
+# Editors write a burst of events per save; collect them before re-checking
+SETTLE_TIME = 0.05
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_MODIFY
+EVENT_HEADER = struct.Struct('iIII')
+
+def open_inotify(directories):
+    """inotify fd watching directories, or None where inotify is unavailable"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+
+    # Watch directories, not files: most editors save by renaming a temp file
+    for directory in directories:
+        if libc.inotify_add_watch(fd, os.fsencode(directory), WATCH_MASK) < 0:
+            os.close(fd)
+            return None
+    return fd
+
+def read_inotify(fd):
+    """Drain pending inotify events; returns the set of touched file names"""
+    touched = set()
+    while True:
+        try:
+            data = os.read(fd, 64 * 1024)
+        except BlockingIOError:
+            return touched
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                touched.add(os.fsdecode(name))
+
+class Watcher:
+    """In-memory results for a set of files, refreshed as they change"""
+
+    def __init__(self, files):
+        self.files = [str(f) for f in files]
+        # path -> (mtime_ns, size, digest, valid, results)
+        self.state = {}
+
+    def stamp(self, filepath):
+        try:
+            st = os.stat(filepath)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def refresh(self, filepath):
+        """Re-check one file; returns (old results, new results) or None if unchanged"""
+        old = self.state.get(filepath)
+        stamp = self.stamp(filepath)
+        if stamp is None:
+            if old is None:
+                return None
+            del self.state[filepath]
+            return old[4], None
+        if old is not None and old[:2] == stamp:
+            return None
+
+        digest = content_hash(filepath)
+        if old is not None and old[2] == digest:
+            self.state[filepath] = stamp + old[2:]
+            return None
+
+        valid, results, _ = inspect_file(filepath)
+        self.state[filepath] = stamp + (digest, valid, results)
+        return (old[4] if old else None), results
+
+    def all_valid(self):
+        return all(entry[3] for entry in self.state.values())
+
+def print_diff(filepath, old, new, elapsed):
+    """Show what changed in one file's results"""
+    stamp = time.strftime('%H:%M:%S')
+    print(f"\n[{stamp}] {filepath} ({elapsed * 1000:.1f} ms)")
+    if new is None:
+        print("  - file removed")
+        return
+    old = old or []
+    for line in old:
+        if line not in new:
+            print(f"  - {line}")
+    for line in new:
+        if line not in old:
+            print(f"  + {line}")
+
+def check_files(watcher, files):
+    changed = False
+    for filepath in files:
+        start = time.perf_counter()
+        diff = watcher.refresh(filepath)
+        if diff is not None:
+            print_diff(filepath, diff[0], diff[1], time.perf_counter() - start)
+            changed = True
+    return changed
+
+def watch(files):
+    """Validate files, then keep re-validating them as they change"""
+    watcher = Watcher(files)
+    for filepath in watcher.files:
+        watcher.refresh(filepath)
+        print(f"\nChecking: {filepath}")
+        entry = watcher.state.get(filepath)
+        for result in entry[4] if entry else ["❌ File not found"]:
+            print(f"  {result}")
+
+    by_name = {}
+    for filepath in watcher.files:
+        by_name.setdefault(Path(filepath).name, []).append(filepath)
+    directories = sorted({os.path.dirname(os.path.abspath(f)) for f in watcher.files})
+    fd = open_inotify(directories)
+
+    mode = "inotify" if fd is not None else f"polling every {POLL_INTERVAL}s"
+    status = "✅ all passing" if watcher.all_valid() else "❌ problems found"
+    print(f"\n👀 Watching {len(watcher.files)} file(s) via {mode} - {status}. Ctrl-C to stop.")
+    sys.stdout.flush()
+
+    try:
+        while True:
+            if fd is None:
+                time.sleep(POLL_INTERVAL)
+                candidates = watcher.files
+            else:
+                select.select([fd], [], [])
+                time.sleep(SETTLE_TIME)
+                names = read_inotify(fd)
+                candidates = [f for name in names for f in by_name.get(name, ())]
+
+            if check_files(watcher, candidates):
+                status = "✅ all passing" if watcher.all_valid() else "❌ problems found"
+                print(f"  → {status}")
+                sys.stdout.flush()
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        if fd is not None:
+            os.close(fd)
+    return 0 if watcher.all_valid() else 1
+
+if __name__ == "__main__":
+    sys.exit(watch(sys.argv[1:] or [str(p) for p in Path('.').glob('*.xml')]))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+xerex_index.py - Persistent element index for the XEREX knowledge files
+Maps element paths, tag names and pattern_NN ids to byte offsets once per content
+hash, so lookups like "current_version of every file" never parse a document
+"""
+
+import xml.etree.ElementTree as ET
+import json
+import os
+import sys
+from pathlib import Path
+
+from validate_xerex import content_hash
+from xerex_io import AtomicFile
+from xml_patch import PatchDocument
+
+INDEX_PATH = Path('.xerex_index.json')
+# Bump whenever the stored layout changes; older indexes are rebuilt
+INDEX_FORMAT = 1
+KNOWLEDGE_DIRS = ('standalone', 'project_knowledge')
+
+def knowledge_files(base='.'):
+    """Every XML document under standalone/ and project_knowledge/"""
+    files = []
+    for directory in KNOWLEDGE_DIRS:
+        files += sorted(str(p) for p in (Path(base) / directory).glob('*.xml'))
+    return files
+
+def build_entry(filepath):
+    """Index one file: root tag plus [path, start, end] per element, in document order
+
+    Paths follow the checks' convention: relative to the root, so the
+    version element is 'current_version' and metadata's is 'metadata/version'.
+    """
+    elements = []
+    with PatchDocument(filepath) as doc:
+        spans = doc.spans
+        stack = [(child, child.tag) for child in reversed(doc.root)]
+        while stack:
+            elem, path = stack.pop()
+            span = spans[elem]
+            elements.append([path, span.start, span.end])
+            stack.extend((child, f"{path}/{child.tag}") for child in reversed(elem))
+        return {'root': doc.root.tag, 'elements': elements}
+
+class FileIndex:
+    """Lookups against one indexed file
+
+    Keys use the check path syntax: 'a/b' is anchored at the root and
+    './/a/b' matches anywhere, so './/pattern_92' finds that pattern in
+    pattern_engine. Results are (start, end) byte ranges of the element.
+    """
+
+    def __init__(self, filepath, entry):
+        self.filepath = filepath
+        self.root = entry['root']
+        self.elements = entry['elements']
+        self.paths = {}
+        self.tags = {}
+        for i, (path, _, _) in enumerate(self.elements):
+            self.paths.setdefault(path, []).append(i)
+            self.tags.setdefault(path.rsplit('/', 1)[-1], []).append(i)
+
+    def _matches(self, key):
+        if not key.startswith('.//'):
+            return self.paths.get(key, [])
+        suffix = key[3:]
+        hits = self.tags.get(suffix.rsplit('/', 1)[-1], [])
+        if '/' not in suffix:
+            return hits
+        return [i for i in hits
+                if self.elements[i][0] == suffix or self.elements[i][0].endswith('/' + suffix)]
+
+    def findall(self, key):
+        return [tuple(self.elements[i][1:]) for i in self._matches(key)]
+
+    def find(self, key):
+        """(start, end) of the first element matching key, or None"""
+        hits = self._matches(key)
+        return tuple(self.elements[hits[0]][1:]) if hits else None
+
+    def children(self, path=''):
+        """Paths of the direct children of path ('' for the root)"""
+        prefix = f"{path}/" if path else ''
+        return [p for p, _, _ in self.elements
+                if p.startswith(prefix) and '/' not in p[len(prefix):]]
+
+    def read(self, key):
+        """Raw bytes of the first element matching key, or None"""
+        span = self.find(key)
+        if span is None:
+            return None
+        with open(self.filepath, 'rb') as f:
+            f.seek(span[0])
+            return f.read(span[1] - span[0])
+
+    def element(self, key):
+        """The first element matching key, parsed from its bytes alone"""
+        fragment = self.read(key)
+        return ET.fromstring(fragment) if fragment is not None else None
+
+    def text(self, key):
+        elem = self.element(key)
+        return elem.text if elem is not None else None
+
+class DocumentIndex:
+    """Persistent index of many files, rebuilt only when content changes
+
+    Entries are stored per content hash; each file also remembers the
+    (mtime_ns, size) it was hashed at, so unchanged files are not even
+    re-hashed. Saved as JSON beside the documents, like the result cache.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = Path(path)
+        self.dirty = False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            data = {}
+        if not isinstance(data, dict) or data.get('format') != INDEX_FORMAT:
+            data = {}
+        # path -> [mtime_ns, size, digest]; digest -> entry
+        self.files = data.get('files', {})
+        self.entries = data.get('entries', {})
+        self.loaded = {}
+
+    def digest(self, filepath):
+        st = os.stat(filepath)
+        stamp = [st.st_mtime_ns, st.st_size]
+        known = self.files.get(filepath)
+        if known is not None and known[:2] == stamp:
+            return known[2]
+        digest = content_hash(filepath)
+        self.files[filepath] = stamp + [digest]
+        self.dirty = True
+        return digest
+
+    def lookup(self, filepath):
+        """FileIndex for filepath, indexing it first if its content is new"""
+        filepath = str(filepath)
+        digest = self.digest(filepath)
+        cached = self.loaded.get(filepath)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        entry = self.entries.get(digest)
+        if entry is None:
+            entry = self.entries[digest] = build_entry(filepath)
+            self.dirty = True
+        index = FileIndex(filepath, entry)
+        self.loaded[filepath] = (digest, index)
+        return index
+
+    def save(self):
+        """Write the index atomically, dropping entries no file points at"""
+        if not self.dirty:
+            return
+        live = {known[2] for known in self.files.values()}
+        self.entries = {d: e for d, e in self.entries.items() if d in live}
+        data = {'format': INDEX_FORMAT, 'files': self.files, 'entries': self.entries}
+        try:
+            with AtomicFile(self.path, 'w', prefix=self.path.name, encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        except OSError:
+            return
+        self.dirty = False
+
+def main(argv=None):
+    """xerex_index.py KEY [FILES...]: print KEY's attributes and text in each file"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        print("Usage: xerex_index.py KEY [FILES...]   e.g. .//current_version, .//pattern_92")
+        return 2
+    key, files = argv[0], argv[1:] or knowledge_files()
+    index = DocumentIndex()
+    status = 0
+    for filepath in files:
+        try:
+            elem = index.lookup(filepath).element(key)
+        except (OSError, ET.ParseError) as e:
+            print(f"{filepath}: ERROR - {e}")
+            status = 1
+            continue
+        if elem is None:
+            shown = 'NOT FOUND'
+        else:
+            attrs = ' '.join(f'{k}="{v}"' for k, v in elem.attrib.items())
+            shown = ' '.join(part for part in (attrs, (elem.text or '').strip()) if part)
+        print(f"{filepath}: {shown or '(empty)'}")
+    index.save()
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+xerex_io.py - Atomic file replacement shared by every tool that rewrites a file
+Output goes to a temp file beside the target, which replaces it in one rename
+only once everything was written; a failure leaves the old file untouched
+"""
+
+import os
+import shutil
+import tempfile
+
+def current_umask():
+    # The umask can only be read by setting it
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+class AtomicFile:
+    """Context manager writing path through a temp file in the same directory
+
+    The with block gets the open temp file. On a clean exit it takes the
+    permission bits of like, else of the path it replaces, else those a
+    new file gets under the umask (not mkstemp's 0600), and replaces
+    path; on an exception, or after discard(), it is deleted and path is
+    left alone. Extra arguments go to open() (mode, encoding, newline).
+    """
+
+    def __init__(self, path, mode='wb', like=None, prefix=None, **open_args):
+        self.path = path
+        self.mode = mode
+        self.like = like
+        self.prefix = prefix
+        self.open_args = open_args
+        self.tmp_path = None
+        self.file = None
+        self.keep = True
+
+    def __enter__(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, self.tmp_path = tempfile.mkstemp(dir=directory, prefix=self.prefix, suffix='.tmp')
+        try:
+            self.file = os.fdopen(fd, self.mode, **self.open_args)
+        except BaseException:
+            os.close(fd)
+            os.unlink(self.tmp_path)
+            raise
+        return self.file
+
+    def discard(self):
+        """Drop what was written instead of replacing path"""
+        self.keep = False
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.file.close()
+            if exc_type is None and self.keep:
+                like = self.like if self.like is not None else self.path
+                if os.path.exists(like):
+                    shutil.copymode(like, self.tmp_path)
+                else:
+                    os.chmod(self.tmp_path, 0o666 & ~current_umask())
+                os.replace(self.tmp_path, self.path)
+        finally:
+            if os.path.exists(self.tmp_path):
+                os.unlink(self.tmp_path)
+        return False
+
+def write_atomic(path, data, like=None):
+    """Replace path with data (bytes) in one rename"""
+    with AtomicFile(path, 'wb', like=like) as f:
+        f.write(data)
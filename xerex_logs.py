@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+xerex_logs.py - Reading response logs for the scanners
+Pulls the response text out of plain or JSON Lines transcripts, cuts the
+streams into batches, and fans the batches out over worker processes without
+reading ahead more than a few per worker
+"""
+
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+# Responses handed to a worker at a time, and batches in flight per worker
+BATCH_LINES = 4096
+INFLIGHT_PER_WORKER = 2
+# Where a JSON Lines log keeps the response text
+TEXT_FIELDS = ('text', 'content', 'response', 'message')
+
+def response_text(line):
+    """The response in one log line: a JSON object's text field, or the line itself"""
+    if line.startswith('{'):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            return line
+        if isinstance(record, dict):
+            for field in TEXT_FIELDS:
+                if isinstance(record.get(field), str):
+                    return record[field]
+    return line
+
+def batches(streams, size=BATCH_LINES):
+    for stream in streams:
+        lines = iter(stream)
+        while True:
+            batch = list(islice(lines, size))
+            if not batch:
+                break
+            yield batch
+
+def map_bounded(func, items, jobs=1, initializer=None, initargs=()):
+    """Yield func(item) for every item, in order, using up to jobs processes
+
+    Only a few items per worker are submitted ahead of the results being
+    consumed, so a long input stream is never read into memory. With
+    jobs <= 1 everything runs in this process, initializer included.
+    """
+    if jobs <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        yield from map(func, items)
+        return
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer,
+                             initargs=initargs) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= jobs * INFLIGHT_PER_WORKER:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+xerex_profile.py - Timing instrumentation for the Robot Inspector
+Spans around file reads, parsing and every registered check, with call counts,
+cumulative and self time, bytes per file, and Chrome trace-event export
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+
+class Profiler:
+    """Collects timed spans; nested spans are subtracted from their parent's self time
+
+    Timestamps come from perf_counter_ns, which is the system-wide monotonic
+    clock on Linux, so spans recorded in worker processes line up with the
+    parent's when merged.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        # name -> [calls, total ns, self ns]
+        self.totals = {}
+        # filepath -> {'bytes': n, 'seconds': s}
+        self.files = {}
+        self.events = []
+        self._children = []
+
+    @contextlib.contextmanager
+    def span(self, name, cat, **args):
+        start = time.perf_counter_ns()
+        self._children.append(0)
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            duration = end - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += duration
+            entry = self.totals.setdefault(name, [0, 0, 0])
+            entry[0] += 1
+            entry[1] += duration
+            entry[2] += duration - children
+            self.events.append({'name': name, 'cat': cat, 'ph': 'X',
+                                'ts': start / 1000, 'dur': duration / 1000,
+                                'pid': self.pid, 'tid': threading.get_native_id(),
+                                'args': args})
+
+    @contextlib.contextmanager
+    def file(self, filepath):
+        """Span one whole file and record its wall time"""
+        filepath = str(filepath)
+        record = self.files.setdefault(filepath, {'bytes': 0, 'seconds': 0.0})
+        start = time.perf_counter()
+        try:
+            with self.span('file', 'file', path=filepath):
+                yield
+        finally:
+            record['seconds'] += time.perf_counter() - start
+
+    def reads(self, f, size, filepath):
+        """Yield chunks of f, timing each read and counting its bytes"""
+        record = self.files.setdefault(str(filepath), {'bytes': 0, 'seconds': 0.0})
+        while True:
+            with self.span('read', 'io'):
+                chunk = f.read(size)
+            if not chunk:
+                return
+            record['bytes'] += len(chunk)
+            yield chunk
+
+    def wrap(self, checks):
+        """Copies of the check specs whose functions run inside a span"""
+        def timed(spec):
+            name = f"check:{spec.id}"
+
+            def wrapper(*args):
+                with self.span(name, 'check'):
+                    return spec.func(*args)
+            return spec._replace(func=wrapper)
+        return [timed(spec) for spec in checks]
+
+    # ---- Export ----
+
+    def summary(self):
+        """Plain-data totals: per-span calls/total/self seconds and per-file bytes/time"""
+        spans = {name: {'calls': calls, 'total_seconds': total / 1e9, 'self_seconds': own / 1e9}
+                 for name, (calls, total, own) in self.totals.items()}
+        return {'spans': spans, 'files': self.files}
+
+    def export(self):
+        """Everything needed to merge this profile into another one"""
+        return {'totals': self.totals, 'files': self.files, 'events': self.events}
+
+    def merge(self, data):
+        for name, values in data['totals'].items():
+            entry = self.totals.setdefault(name, [0, 0, 0])
+            for i, value in enumerate(values):
+                entry[i] += value
+        for filepath, record in data['files'].items():
+            mine = self.files.setdefault(filepath, {'bytes': 0, 'seconds': 0.0})
+            mine['bytes'] += record['bytes']
+            mine['seconds'] += record['seconds']
+        self.events.extend(data['events'])
+
+    def chrome_trace(self):
+        """Trace-event JSON for chrome://tracing or Perfetto, with the summary alongside"""
+        return {'traceEvents': self.events, 'displayTimeUnit': 'ms',
+                'otherData': {'summary': self.summary()}}
+
+    def write_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def table(self):
+        """Ranked hot-spot table (by self time) plus per-file throughput"""
+        lines = []
+        total_self = sum(own for _, _, own in self.totals.values()) or 1
+        lines.append(f"  {'span':<28} {'calls':>8} {'total ms':>10} {'self ms':>10} {'self %':>7}")
+        ranked = sorted(self.totals.items(), key=lambda item: item[1][2], reverse=True)
+        for name, (calls, total, own) in ranked:
+            lines.append(f"  {name:<28} {calls:>8,} {total / 1e6:>10.2f} {own / 1e6:>10.2f} "
+                         f"{own * 100 / total_self:>6.1f}%")
+        if self.files:
+            lines.append("")
+            lines.append(f"  {'file':<52} {'bytes':>12} {'ms':>9} {'MB/s':>8}")
+            for filepath, record in sorted(self.files.items(), key=lambda item: -item[1]['seconds']):
+                seconds = record['seconds']
+                rate = record['bytes'] / 1024 ** 2 / seconds if seconds else 0
+                lines.append(f"  {filepath:<52} {record['bytes']:>12,} {seconds * 1000:>9.2f} {rate:>8.1f}")
+        return '\n'.join(lines)
+
+class NullProfiler:
+    """Stand-in when profiling is off: same interface, no bookkeeping"""
+
+    def span(self, name, cat, **args):
+        return contextlib.nullcontext()
+
+    def file(self, filepath):
+        return contextlib.nullcontext()
+
+    def reads(self, f, size, filepath):
+        return iter(lambda: f.read(size), b'')
+
+    def wrap(self, checks):
+        return checks
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+xerex_report.py - Machine-readable Robot Inspector output
+Structured findings (check id, severity, element path, line, timing) streamed
+as JSON Lines as each file finishes, or collected into one SARIF 2.1.0 log
+"""
+
+import json
+import re
+import time
+from pathlib import Path
+
+FORMATS = ('text', 'jsonl', 'sarif')
+ERROR, WARNING, OK = 'error', 'warning', 'ok'
+# Leading status icons on the human-readable result lines
+ICON_CHARS = '✓✅❌⚠️ '
+PARSE_CHECK = 'xml_parse'
+# expat's messages end with the position, its column counting from 0
+PARSE_POSITION_RE = re.compile(r'line (\d+), column (\d+)$')
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_LEVELS = {ERROR: 'error', WARNING: 'warning'}
+TOOL_NAME = 'XEREX Robot Inspector'
+
+def severity(valid, message):
+    if not valid:
+        return ERROR
+    return WARNING if message.startswith('⚠') else OK
+
+def finding(check_id, valid, message, path=None, line=None, column=None, seconds=0.0):
+    """One check outcome as a plain dict; line and column are 1-based, None if unknown"""
+    return {'check': check_id, 'severity': severity(valid, message),
+            'message': message.lstrip(ICON_CHARS), 'path': path, 'line': line,
+            'column': column, 'seconds': seconds}
+
+def parse_error_finding(message):
+    m = PARSE_POSITION_RE.search(message)
+    line, column = (int(m.group(1)), int(m.group(2)) + 1) if m else (None, None)
+    return finding(PARSE_CHECK, False, message, line=line, column=column)
+
+def file_findings(results, stats):
+    """Findings for one validated file; a parse failure has no stats, only its message"""
+    if stats is not None:
+        return stats['findings']
+    return [parse_error_finding(results[0])]
+
+def location(filepath, record):
+    """'  [file:line:col]' suffix that editors and terminals turn into a link"""
+    if record.get('line') is None:
+        return ''
+    return f"  [{Path(filepath).as_posix()}:{record['line']}:{record['column']}]"
+
+class ReportWriter:
+    """Writes validation outcomes to stream in one of the machine formats
+
+    JSON Lines go out (and are flushed) per file, so a long run can be
+    consumed while it is still going; SARIF is a single document and is
+    written by close().
+    """
+
+    def __init__(self, fmt, stream, checks):
+        if fmt not in FORMATS[1:]:
+            raise ValueError(f"Unknown report format {fmt!r}")
+        self.format = fmt
+        self.stream = stream
+        self.checks = checks
+        self.counts = {ERROR: 0, WARNING: 0, OK: 0}
+        self.files = 0
+        self.all_valid = True
+        self.sarif_results = []
+        self.started = time.gmtime()
+
+    def file(self, filepath, valid, results, stats):
+        filepath = Path(filepath).as_posix()
+        findings = file_findings(results, stats)
+        self.files += 1
+        self.all_valid = self.all_valid and valid
+        for record in findings:
+            self.counts[record['severity']] += 1
+
+        if self.format == 'jsonl':
+            for record in findings:
+                self._line({'type': 'finding', 'file': filepath, **record})
+            record = {'type': 'file', 'file': filepath, 'valid': valid}
+            if stats is not None:
+                record.update(seconds=stats['seconds'], bytes=stats['bytes'],
+                              chars=stats['chars'], tokens=stats['tokens'])
+            self._line(record)
+            self.stream.flush()
+        else:
+            self.sarif_results.extend(self._sarif_result(filepath, record)
+                                      for record in findings if record['severity'] != OK)
+
+    def close(self):
+        if self.format == 'jsonl':
+            self._line({'type': 'summary', 'files': self.files, 'valid': self.all_valid,
+                        'errors': self.counts[ERROR], 'warnings': self.counts[WARNING]})
+        else:
+            json.dump(self.sarif(), self.stream, ensure_ascii=False, indent=2)
+            self.stream.write('\n')
+        self.stream.flush()
+
+    def _line(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    # ---- SARIF ----
+
+    def _rules(self):
+        rules = [{'id': PARSE_CHECK, 'shortDescription': {'text': "Document is well-formed XML"}}]
+        for spec in self.checks:
+            doc = (spec.func.__doc__ or spec.id).strip().splitlines()[0]
+            rules.append({'id': spec.id, 'shortDescription': {'text': doc}})
+        return rules
+
+    def _sarif_result(self, filepath, record):
+        physical = {'artifactLocation': {'uri': filepath}}
+        if record['line'] is not None:
+            physical['region'] = {'startLine': record['line'], 'startColumn': record['column']}
+        place = {'physicalLocation': physical}
+        if record['path']:
+            place['logicalLocations'] = [{'fullyQualifiedName': record['path'], 'kind': 'element'}]
+        return {'ruleId': record['check'], 'level': SARIF_LEVELS[record['severity']],
+                'message': {'text': record['message']}, 'locations': [place],
+                'properties': {'seconds': record['seconds']}}
+
+    def sarif(self):
+        stamp = '%Y-%m-%dT%H:%M:%SZ'
+        return {
+            '$schema': SARIF_SCHEMA,
+            'version': '2.1.0',
+            'runs': [{
+                'tool': {'driver': {'name': TOOL_NAME, 'rules': self._rules()}},
+                'invocations': [{'executionSuccessful': True,
+                                 'startTimeUtc': time.strftime(stamp, self.started),
+                                 'endTimeUtc': time.strftime(stamp, time.gmtime())}],
+                'results': self.sarif_results,
+            }],
+        }
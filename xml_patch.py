@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+xml_patch.py - Edits XEREX documents without re-serializing them
+Records where every element's text and tags sit in the file while parsing, then
+splices only the edited byte ranges into the output; comments, CDATA and
+formatting everywhere else come through byte for byte
+"""
+
+import xml.etree.ElementTree as ET
+import xml.parsers.expat as expat
+import mmap
+import os
+import re
+from xml.sax.saxutils import escape
+from xerex_io import AtomicFile
+
+CHUNK_SIZE = 64 * 1024
+CDATA_OPEN = b'<![CDATA['
+CDATA_CLOSE = b']]>'
+
+class Span:
+    """Byte offsets of one element in the source file
+
+    start..head is the start tag, head..text_end the element's own text
+    (elem.text), end_start..end the end tag. end_start is None for a
+    self-closing tag, whose start tag runs to end. cdata counts the CDATA
+    sections in the text; cdata_start..cdata_end is the content of the
+    first. split is set when a comment or processing instruction falls
+    inside the text, so it is not one byte range.
+    """
+    __slots__ = ('start', 'head', 'text_end', 'end_start', 'end', 'cdata',
+                 'cdata_start', 'cdata_end', 'split')
+
+    def __init__(self, start):
+        self.start = start
+        self.head = self.text_end = self.end_start = self.end = None
+        self.cdata = 0
+        self.cdata_start = self.cdata_end = None
+        self.split = False
+
+class Comment:
+    """A comment's text and where the whole <!--...--> sits in the file"""
+    __slots__ = ('start', 'end', 'text')
+
+    def __init__(self, start, text):
+        self.start = start
+        self.end = None
+        self.text = text
+
+class PatchDocument:
+    """An ElementTree over a file plus the edits to splice back into it
+
+    Read the tree through .root as usual, and the comments, which the
+    tree leaves out, through .comments; change them only through
+    set_text(), set_attribute(), append() and set_comment(), which record
+    byte-range edits. write() then copies the untouched ranges straight from the
+    source (copy_file_range where the kernel has it, the mmap otherwise)
+    and writes just the edited bytes, into a temp file that replaces the
+    source in one rename.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.file = open(filepath, 'rb')
+        size = os.fstat(self.file.fileno()).st_size
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self.spans = {}
+        self.comments = []
+        self.edits = []
+        # (start, end) of each non-empty edit -> its index in edits
+        self.ranges = {}
+        self.root = self._parse()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self.file.close()
+
+    @property
+    def changed(self):
+        return bool(self.edits)
+
+    # ---- Parsing ----
+
+    def _parse(self):
+        builder = ET.TreeBuilder()
+        parser = expat.ParserCreate()
+        stack = []
+        # (span, field, offset): set span.field to the next event offset past offset
+        waiting = []
+        text_open = []
+        # element whose text a comment or PI just interrupted; more text
+        # for it before a child or end tag means the text is split
+        interrupted = [None]
+
+        def event(text=False):
+            at = parser.CurrentByteIndex
+            while waiting and at > waiting[0][2]:
+                span, field, _ = waiting.pop(0)
+                setattr(span, field, at)
+            if not text and text_open:
+                text_open.pop().text_end = at
+            return at
+
+        def start(tag, attrs):
+            at = event()
+            interrupted[0] = None
+            elem = builder.start(tag, attrs)
+            span = self.spans[elem] = Span(at)
+            waiting.append((span, 'head', at))
+            stack.append(span)
+            text_open.append(span)
+
+        def end(tag):
+            at = event()
+            interrupted[0] = None
+            builder.end(tag)
+            span = stack.pop()
+            if at == span.head and self.data[at - 2:at] == b'/>':
+                # <tag/>: expat reports the end after the tag, with nothing between
+                span.end = at
+                span.text_end = None
+            else:
+                span.end_start = at
+                waiting.append((span, 'end', at))
+
+        def data(text):
+            event(text=True)
+            if interrupted[0] is not None:
+                interrupted[0].split = True
+            builder.data(text)
+
+        def start_cdata():
+            at = event(text=True)
+            if text_open:
+                span = text_open[-1]
+                span.cdata += 1
+                if span.cdata == 1:
+                    span.cdata_start = at + len(CDATA_OPEN)
+
+        def end_cdata():
+            at = event(text=True)
+            if text_open and text_open[-1].cdata == 1 and text_open[-1].cdata_end is None:
+                text_open[-1].cdata_end = at
+
+        def markup():
+            if text_open and stack and text_open[-1] is stack[-1]:
+                interrupted[0] = stack[-1]
+            return event()
+
+        def comment(text):
+            entry = Comment(markup(), text)
+            # A comment cannot contain '--', so the first '-->' ends it
+            entry.end = self.data.find(b'-->', entry.start) + len(b'-->')
+            self.comments.append(entry)
+
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = data
+        parser.StartCdataSectionHandler = start_cdata
+        parser.EndCdataSectionHandler = end_cdata
+        parser.CommentHandler = comment
+        parser.ProcessingInstructionHandler = lambda target, text: markup()
+
+        try:
+            for offset in range(0, len(self.data), CHUNK_SIZE):
+                parser.Parse(self.data[offset:offset + CHUNK_SIZE], False)
+            parser.Parse(b'', True)
+        except expat.ExpatError as e:
+            err = ET.ParseError(str(e))
+            err.code = e.code
+            err.position = (e.lineno, e.offset)
+            raise err from None
+
+        for span, field, _ in waiting:
+            setattr(span, field, len(self.data))
+        return builder.close()
+
+    # ---- Edits ----
+
+    def _edit(self, start, end, text):
+        """Record one edit; a later edit of the same non-empty range replaces it"""
+        edit = (start, end, text.encode('utf-8'))
+        if start < end and (start, end) in self.ranges:
+            self.edits[self.ranges[(start, end)]] = edit
+            return
+        if start < end:
+            self.ranges[(start, end)] = len(self.edits)
+        self.edits.append(edit)
+
+    def _self_closing(self, span, content):
+        """Rewrite <tag .../> as <tag ...>content</tag>"""
+        head = self.data[span.start:span.end].decode('utf-8')
+        tag = re.match(r'<([^\s/>]+)', head).group(1)
+        opened = re.sub(r'\s*/>$', '>', head)
+        self._edit(span.start, span.end, f"{opened}{content}</{tag}>")
+
+    def set_text(self, elem, text):
+        """Replace elem.text, keeping a CDATA wrapper if it had one
+
+        When the text is one CDATA section and the new text keeps the
+        whitespace around it, only the section's content is rewritten.
+        Raises ValueError if a comment or processing instruction splits
+        the text, since no single edit could then replace it.
+        """
+        span = self.spans[elem]
+        if span.split:
+            raise ValueError(f"<{elem.tag}> text is split by a comment or processing instruction")
+        if span.cdata == 1 and ']]>' not in text:
+            before = self.data[span.head:span.cdata_start - len(CDATA_OPEN)]
+            after = self.data[span.cdata_end + len(CDATA_CLOSE):span.text_end]
+            if not before.strip() and not after.strip():
+                before, after = before.decode('ascii'), after.decode('ascii')
+                inner = text[len(before):len(text) - len(after)]
+                if text == before + inner + after:
+                    self._edit(span.cdata_start, span.cdata_end, inner)
+                    elem.text = text
+                    return
+        if span.cdata and ']]>' not in text:
+            content = f"<![CDATA[{text}]]>"
+        else:
+            content = escape(text)
+        if span.end_start is None:
+            self._self_closing(span, content)
+        else:
+            self._edit(span.head, span.text_end, content)
+        elem.text = text
+
+    def set_attribute(self, elem, name, value):
+        """Set one attribute in elem's start tag"""
+        span = self.spans[elem]
+        head = self.data[span.start:span.head].decode('utf-8')
+        m = re.search(r'\s' + re.escape(name) + r'\s*=\s*(["\'])(.*?)\1', head, re.S)
+        if m:
+            quote = m.group(1)
+            entities = {'"': '&quot;'} if quote == '"' else {"'": '&apos;'}
+            prefix = len(head[:m.start(2)].encode('utf-8'))
+            old = len(m.group(2).encode('utf-8'))
+            self._edit(span.start + prefix, span.start + prefix + old, escape(value, entities))
+        else:
+            close = len(head) - (2 if head.endswith('/>') else 1)
+            offset = span.start + len(head[:close].encode('utf-8'))
+            self._edit(offset, offset, f' {name}="{escape(value, {chr(34): "&quot;"})}"')
+        elem.set(name, value)
+
+    def set_comment(self, comment, text):
+        """Replace the text between a comment's <!-- and -->"""
+        if '--' in text or text.endswith('-'):
+            raise ValueError("Comment text cannot contain '--' or end with '-'")
+        self._edit(comment.start + len('<!--'), comment.end - len('-->'), text)
+        comment.text = text
+
+    def append(self, parent, markup):
+        """Add the element markup as parent's last child"""
+        child = ET.fromstring(markup)
+        span = self.spans[parent]
+        if span.end_start is None:
+            self._self_closing(span, markup)
+        else:
+            self._edit(span.end_start, span.end_start, markup + '\n')
+        parent.append(child)
+        return child
+
+    # ---- Output ----
+
+    def write(self, output=None):
+        """Write the patched document to output (default: over the source)
+
+        Returns the number of bytes written that did not come from the source.
+        """
+        return _write_edits(self.file, self.data, self.filepath, sorted_edits(self.edits), output)
+
+def sorted_edits(edits):
+    """Edits in file order; raises ValueError if two of them overlap
+
+    An insertion (start == end) goes before a replacement starting at the
+    same offset, and only a non-empty edit can overlap the next one.
+    """
+    edits = sorted(enumerate(edits), key=lambda e: (e[1][0], e[1][1] > e[1][0], e[0]))
+    edits = [edit for _, edit in edits]
+    for (prev_start, prev_end, _), (start, _, _) in zip(edits, edits[1:]):
+        if prev_start < prev_end and start < prev_end:
+            raise ValueError("Overlapping edits to the same part of the document")
+    return edits
+
+def splice_file(filepath, edits, output=None):
+    """Write filepath with raw byte ranges replaced, without parsing it
+
+    edits are (start, end, bytes) as PatchDocument records them; keeping the
+    result well-formed is up to the caller. Returns the bytes written that
+    did not come from the source.
+    """
+    with open(filepath, 'rb') as src:
+        size = os.fstat(src.fileno()).st_size
+        data = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        try:
+            return _write_edits(src, data, filepath, sorted_edits(edits), output)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+def _write_edits(src, data, filepath, edits, output):
+    same = output is None or os.path.abspath(output) == os.path.abspath(filepath)
+    if same and not edits:
+        return 0
+
+    # Even same-length edits go through a temp file: patching the source
+    # where it is could leave it half-edited if the write were cut short
+    with AtomicFile(filepath if same else output, 'wb', like=filepath) as dst:
+        pos = 0
+        for start, end, text in edits:
+            _copy(src, data, dst, pos, start)
+            dst.write(text)
+            pos = end
+        _copy(src, data, dst, pos, len(data))
+    return sum(len(text) for _, _, text in edits)
+
+def _copy(src, data, dst, start, end):
+    """Copy source bytes start..end to dst without passing through Python"""
+    if end <= start:
+        return
+    if hasattr(os, 'copy_file_range'):
+        dst.flush()
+        src_fd, dst_fd = src.fileno(), dst.fileno()
+        offset = start
+        try:
+            while offset < end:
+                copied = os.copy_file_range(src_fd, dst_fd, end - offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+                dst.seek(0, os.SEEK_END)
+            start = offset
+        except OSError:
+            # e.g. EXDEV on kernels without cross-filesystem support
+            dst.seek(0, os.SEEK_END)
+            start = offset
+        if start >= end:
+            return
+    dst.write(memoryview(data)[start:end])